@@ -87,15 +87,13 @@
 
 #for cloud run dont mind it
 import os
-from flask import Flask
+from flask import Flask, current_app
 from flask_jwt_extended import JWTManager
 from config import Config, CorsConfig
-from google.cloud import firestore, storage
-from google.auth import exceptions
 from routes.auth import auth_bp
 from routes.inference import inference_bp
-from tensorflow.keras.models import load_model
-import logging
+from services.model_loader import start_model_loading
+from services import metrics
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -114,33 +112,13 @@ else:
     # Cloud Run: use Application Default Credentials (no JSON file needed)
     print("[INFO] Running on Cloud Run. Using Application Default Credentials.")
 
-# Initialize Firestore client
-try:
-    db = firestore.Client()
-    print("[INFO] Firestore client initialized successfully.")
-except exceptions.DefaultCredentialsError as e:
-    print(f"[ERROR] Failed to initialize Firestore: {e}")
-
-# Initialize Google Cloud Storage client
-GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "mymlbucket017")
-try:
-    gcs_client = storage.Client()
-    bucket = gcs_client.bucket(GCS_BUCKET_NAME)
-    bucket.exists()  # Trigger API call to verify access
-    print(f"[INFO] GCS client initialized. Bucket '{GCS_BUCKET_NAME}' accessible.")
-except Exception as e:
-    print(f"[ERROR] Failed to access GCS bucket '{GCS_BUCKET_NAME}': {e}")
-
-# Load Keras model
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "model", "modelsl_saved_model.keras")
-try:
-    keras_model = load_model(MODEL_PATH)
-    print("[INFO] Keras model loaded successfully.")
-except Exception as e:
-    keras_model = None
-    print(f"[ERROR] Failed to load Keras model: {e}")
-
-app.config["KERAS_MODEL"] = keras_model
+# Firestore/GCS clients are created lazily by services.clients on first use.
+# The model (and TensorFlow import) loads in the background; see /ready.
+start_model_loading(app)
+
+# Histogram durasi per tahap di /metrics (format Prometheus) + header Server-Timing
+metrics.init_app(app)
+
 app.json.sort_keys = False
 
 app.register_blueprint(auth_bp, url_prefix="/auth")
@@ -150,6 +128,15 @@ app.register_blueprint(inference_bp, url_prefix="/inference")
 def health_check():
     return {"status": "OK"}, 200
 
+@app.route("/ready", methods=["GET"])
+def readiness_check():
+    # Siap menerima /inference/predict setelah model selesai dimuat dan di-warm-up
+    if not current_app.config["MODEL_READY"].is_set():
+        return {"status": "LOADING"}, 503
+    if current_app.config.get("SERVING_FN") is None and current_app.config.get("KERAS_MODEL") is None:
+        return {"status": "MODEL_UNAVAILABLE"}, 503
+    return {"status": "READY", "model_load_seconds": current_app.config.get("MODEL_LOAD_SECONDS")}, 200
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8080))
     app.run(host="0.0.0.0", port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,55 @@
+# asgi.py
+# Entrypoint ASGI (SERVER_INTERFACE=asgi di gunicorn.conf.py, worker uvicorn).
+# Route yang hanya menunggu Firestore (history, get by id, login, register)
+# dilayani async lewat Firestore AsyncClient di event loop worker, jadi request
+# yang menunggu tidak memegang thread. Semua route lain, termasuk predict,
+# tetap dijalankan app Flask di thread pool a2wsgi; inference tetap lewat
+# batcher/executor yang sama seperti di gthread.
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.datastructures import QueryParams
+from starlette.middleware import Middleware
+from starlette.routing import Route
+
+from app import app as flask_app
+from routes import auth_async, inference_async
+from routes.inference import stream_requested
+from services.asgi_support import asgi_view
+from services.serving_profile import serving_layout
+
+# Thread pool untuk request Flask = GUNICORN_THREADS, sama dengan kapasitas worker gthread
+flask_asgi = WSGIMiddleware(flask_app, workers=serving_layout()["threads"])
+
+
+class StreamFallback:
+    """GET /inference/history?stream=1 (response chunked) tetap dilayani Flask."""
+
+    def __init__(self, app, fallback):
+        self.app = app
+        self.fallback = fallback
+
+    async def __call__(self, scope, receive, send):
+        if stream_requested(QueryParams(scope.get("query_string", b""))):
+            return await self.fallback(scope, receive, send)
+        return await self.app(scope, receive, send)
+
+
+def view(rule, handler):
+    return asgi_view(flask_app, rule, handler)
+
+
+routes = [
+    Route("/inference/history", view("/inference/history", inference_async.get_history), methods=["GET"],
+          middleware=[Middleware(StreamFallback, fallback=flask_asgi)]),
+    # Route Flask statis di bawah /inference (labels, stats, summary, predict, ...)
+    # harus dicocokkan sebelum /inference/{prediction_id}
+    *[Route(rule.rule, flask_asgi) for rule in flask_app.url_map.iter_rules()
+      if rule.rule.startswith("/inference/") and not rule.arguments],
+    Route("/inference/{prediction_id}",
+          view("/inference/<prediction_id>", inference_async.get_prediction_by_id), methods=["GET"]),
+    Route("/auth/login", view("/auth/login", auth_async.login), methods=["POST"]),
+    Route("/auth/register", view("/auth/register", auth_async.register), methods=["POST"]),
+    Route("/{path:path}", flask_asgi),
+]
+
+app = Starlette(routes=routes)
@@ -0,0 +1,192 @@
+"""Bandingkan kapasitas route I/O-bound antara worker gthread (WSGI) dan uvicorn (ASGI).
+
+Untuk setiap SERVER_INTERFACE, gunicorn dijalankan dengan gunicorn.conf.py dan
+benchmarks.fake_app (Firestore/GCS in-memory, jeda ``--firestore-latency-ms``
+per RPC, user dan prediksi benchmark dibuat sebelum fork). Layout worker x
+thread sama untuk kedua interface. Read cache dimatikan agar setiap request
+benar-benar menunggu Firestore. Client asyncio (satu koneksi keep-alive per
+client) mengirim request bersamaan selama ``--duration`` detik untuk setiap
+nilai ``--concurrency``.
+
+Dilaporkan throughput, latensi p50/p95/p99, error (status >= 500 atau koneksi
+gagal) dan total PSS proses gunicorn. Dengan gthread, request yang sedang
+menunggu Firestore memegang satu thread, jadi throughput route ini dibatasi
+kira-kira workers x threads / latensi.
+
+Jalankan dari folder macro-nutrient:
+    python -m benchmarks.bench_asgi --firestore-latency-ms 50 --concurrency 16,64,256
+    python -m benchmarks.bench_asgi --scenarios history,get,login --layout 1x16 --output asgi.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_layout import free_port, total_pss_mb, wait_ready
+
+INTERFACES = ("wsgi", "asgi")
+SCENARIOS = ("history", "get", "login")
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark123"
+
+
+def build_requests(scenario, token, predictions):
+    """Daftar request mentah HTTP/1.1 yang dikirim bergantian untuk satu skenario."""
+    if scenario == "history":
+        return [f"GET /inference/history?limit=20 HTTP/1.1\r\nHost: bench\r\n"
+                f"Authorization: Bearer {token}\r\n\r\n".encode()]
+    if scenario == "get":
+        return [f"GET /inference/bench{i:06d} HTTP/1.1\r\nHost: bench\r\n\r\n".encode() for i in range(predictions)]
+    body = json.dumps({"email": EMAIL, "password": PASSWORD}).encode()
+    return [f"POST /auth/login HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body]
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def drive(port, requests, concurrency, duration):
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    deadline = time.perf_counter() + duration
+
+    async def client(i):
+        reader = writer = None
+        n = i
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(requests[n % len(requests)])
+                n += concurrency
+                status = await read_response(reader)
+                if status >= 500:
+                    errors[i] += 1
+                latencies[i].append(time.perf_counter() - t0)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors[i] += 1
+                if writer is not None:
+                    writer.close()
+                reader = writer = None
+                await asyncio.sleep(0.01)
+        if writer is not None:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    values = sorted(v for per_client in latencies for v in per_client)
+
+    def pct(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1) if values else None
+
+    return {"requests": len(values), "throughput_rps": round(len(values) / elapsed, 2), "errors": sum(errors),
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
+
+
+def login_token(port):
+    import http.client
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("POST", "/auth/login", body=json.dumps({"email": EMAIL, "password": PASSWORD}),
+                 headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    if response.status != 200:
+        raise SystemExit(f"Login benchmark gagal: {response.status} {payload}")
+    return payload["result"]["token"]
+
+
+def run_interface(interface, args, results):
+    workers, threads = (int(v) for v in args.layout.split("x"))
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        SERVER_INTERFACE=interface,
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads),
+        INFERENCE_BACKEND="none",
+        READ_CACHE_SIZE="0",
+        FAKE_FIRESTORE_LATENCY_MS=str(args.firestore_latency_ms),
+        FAKE_SEED_PREDICTIONS=str(args.predictions),
+        FAKE_SEED_EMAIL=EMAIL,
+        FAKE_SEED_PASSWORD=PASSWORD,
+    )
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "benchmarks.fake_app:app"],
+        env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    try:
+        # Tanpa model /ready tidak pernah 200; /health cukup untuk route yang diukur
+        if not wait_ready(port, workers, args.startup_timeout, path="/health"):
+            log.seek(0)
+            raise SystemExit(f"gunicorn tidak siap:\n{log.read().decode(errors='replace')[-3000:]}")
+        token = login_token(port)
+        for scenario in args.scenarios.split(","):
+            requests = build_requests(scenario, token, args.predictions)
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                asyncio.run(drive(port, requests, concurrency, min(2.0, args.duration)))  # warm-up
+                r = asyncio.run(drive(port, requests, concurrency, args.duration))
+                r.update(interface=interface, scenario=scenario, concurrency=concurrency, pss_mb=total_pss_mb(proc.pid))
+                results.append(r)
+                print(f"{interface:>9} {scenario:>8} {concurrency:>6} {r['throughput_rps']:>8.1f} "
+                      f"{r['p50_ms'] or 0:>8.1f} {r['p95_ms'] or 0:>8.1f} {r['p99_ms'] or 0:>8.1f} "
+                      f"{r['pss_mb']:>8.1f} {r['errors']:>7}", flush=True)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interfaces", default=",".join(INTERFACES))
+    parser.add_argument("--scenarios", default="history,get")
+    parser.add_argument("--layout", default="1x16", help="WORKERSxTHREADS, sama untuk semua interface")
+    parser.add_argument("--concurrency", default="16,64,256")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--firestore-latency-ms", type=float, default=50)
+    parser.add_argument("--predictions", type=int, default=200, help="Prediksi milik user benchmark")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Skenario tidak dikenal: {', '.join(sorted(unknown))}")
+
+    print(f"layout {args.layout}, Firestore {args.firestore_latency_ms:.0f} ms/RPC, {args.duration:.0f} s per run\n")
+    print(f"{'interface':>9} {'scenario':>8} {'conc':>6} {'req/s':>8} {'p50_ms':>8} {'p95_ms':>8} "
+          f"{'p99_ms':>8} {'pss_mb':>8} {'errors':>7}")
+    results = []
+    for interface in args.interfaces.split(","):
+        run_interface(interface, args, results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
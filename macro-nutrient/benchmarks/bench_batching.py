@@ -0,0 +1,97 @@
+"""Benchmark micro-batching inference.
+
+Menjalankan sejumlah client bersamaan yang masing-masing mengirim tensor
+(1, 224, 224, 3) lewat BatchScheduler, lalu melaporkan throughput dan latensi
+p50/p99 untuk setiap kombinasi max_batch_size x max_wait_ms.
+
+Jalankan dari folder macro-nutrient:
+    python -m benchmarks.bench_batching --model model/modelsl_saved_model.keras
+Tanpa --model, dipakai MobileNetV2 (bobot acak, 5 kelas) sebagai pengganti.
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from services.batcher import BatchScheduler
+
+
+def load_predict_fn(model_path):
+    import tensorflow as tf
+
+    if model_path:
+        model = tf.keras.models.load_model(model_path)
+    else:
+        model = tf.keras.applications.MobileNetV2(weights=None, classes=5, input_shape=(224, 224, 3))
+    model.predict_on_batch(np.zeros((1, 224, 224, 3), dtype="float32"))
+    return model.predict_on_batch
+
+
+def run_load(predict_fn, batch_size, wait_ms, clients, requests_per_client):
+    scheduler = None
+    if batch_size > 0:
+        scheduler = BatchScheduler(predict_fn, max_batch_size=batch_size, max_wait_ms=wait_ms)
+        call = scheduler.submit
+    else:
+        call = predict_fn
+
+    x = np.random.rand(1, 224, 224, 3).astype("float32")
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        local = []
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            call(x)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "batch_size": batch_size,
+        "wait_ms": wait_ms,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+    }
+    if scheduler is not None:
+        result["avg_batch"] = scheduler.stats()["avg_batch_size"]
+        scheduler.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Path model .keras (default: MobileNetV2 acak)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20, help="Request per client")
+    parser.add_argument("--batch-sizes", default="1,4,8,16,32")
+    parser.add_argument("--waits", default="0,2,5,10", help="max_wait_ms yang diuji")
+    args = parser.parse_args()
+
+    predict_fn = load_predict_fn(args.model)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    waits = [float(w) for w in args.waits.split(",")]
+
+    print(f"{'batch':>6} {'wait_ms':>8} {'req/s':>8} {'p50_ms':>8} {'p99_ms':>8} {'avg_batch':>9}")
+    # batch 0 = tanpa scheduler (predict langsung per request, seperti sebelumnya)
+    settings = [(0, 0.0)] + [(b, w) for b in batch_sizes for w in waits]
+    for batch_size, wait_ms in settings:
+        r = run_load(predict_fn, batch_size, wait_ms, args.clients, args.requests)
+        label = "off" if batch_size == 0 else str(batch_size)
+        print(f"{label:>6} {wait_ms:>8g} {r['throughput']:>8.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p99_ms']:>8.1f} {r.get('avg_batch', 1):>9}")
+
+
+if __name__ == "__main__":
+    main()
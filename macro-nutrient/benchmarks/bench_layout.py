@@ -0,0 +1,250 @@
+"""Pilih layout gunicorn (worker x thread) terbaik untuk jumlah core tertentu.
+
+Untuk setiap layout, gunicorn dijalankan dengan gunicorn.conf.py (preload,
+gthread) dan benchmarks.fake_app (Firestore/GCS in-memory), dibatasi ke
+``--cores`` CPU lewat CPU affinity. Thread TensorFlow per worker mengikuti
+services/serving_profile.py (intra_op = cores / workers) kecuali diberikan
+di layout. Client HTTP bersamaan mengirim POST /inference/predict dengan
+gambar berbeda (prediction cache dimatikan) selama ``--duration`` detik.
+
+Dilaporkan throughput, latensi p50/p95/p99 dan total PSS semua proses
+gunicorn (memori yang dibagi copy-on-write dihitung proporsional). Layout
+dengan throughput tertinggi yang p95-nya tidak melewati ``--max-p95-ms``
+direkomendasikan; set nilainya sebagai GUNICORN_WORKERS, GUNICORN_THREADS,
+TF_INTRA_OP_THREADS dan TF_INTER_OP_THREADS di deployment.
+
+Jalankan dari folder macro-nutrient:
+    python -m benchmarks.bench_layout --cores 4 --model model/modelsl_saved_model.keras
+    python -m benchmarks.bench_layout --cores 4 --layouts 1x8,2x4,4x2,2x4:1:2 --output layout.json
+Format layout: WORKERSxTHREADS[:INTRA_OP[:INTER_OP]]. Tanpa --model, dipakai
+MobileNetV2 (bobot acak, 5 kelas) sebagai pengganti.
+"""
+import argparse
+import http.client
+import io
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from services.serving_profile import available_cpus
+
+
+def stand_in_model(path):
+    import tensorflow as tf
+
+    model = tf.keras.applications.MobileNetV2(weights=None, classes=5, input_shape=(224, 224, 3))
+    model.save(path)
+    return path
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def multipart_bodies(count, size):
+    from PIL import Image
+
+    rng = random.Random(0)
+    bodies = []
+    for i in range(count):
+        buf = io.BytesIO()
+        Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3))).save(buf, "JPEG", quality=90)
+        boundary = uuid.uuid4().hex
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"image\"; filename=\"img{i}.jpg\"\r\n"
+                f"Content-Type: image/jpeg\r\n\r\n").encode() + buf.getvalue() + f"\r\n--{boundary}--\r\n".encode()
+        bodies.append((f"multipart/form-data; boundary={boundary}", body))
+    return bodies
+
+
+def parse_layout(text, cores):
+    parts = text.split(":")
+    workers, threads = (int(v) for v in parts[0].split("x"))
+    intra = int(parts[1]) if len(parts) > 1 else max(1, cores // workers)
+    inter = int(parts[2]) if len(parts) > 2 else 1
+    return {"workers": workers, "threads": threads, "intra_op": intra, "inter_op": inter}
+
+
+def default_layouts(cores):
+    layouts = []
+    for workers in sorted({1, max(1, cores // 2), cores}):
+        for threads in (2, 4, 8):
+            layouts.append(parse_layout(f"{workers}x{threads}", cores))
+    return layouts
+
+
+def total_pss_mb(pid):
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    total = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return round(total / 1024, 1)
+
+
+def wait_ready(port, workers, timeout, path="/ready"):
+    # /ready dijawab worker mana saja; tunggu beberapa kali 200 berturut-turut
+    deadline = time.time() + timeout
+    ok = 0
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", path)
+            ok = ok + 1 if conn.getresponse().status == 200 else 0
+            conn.close()
+            if ok >= workers * 3:
+                return True
+        except OSError:
+            ok = 0
+        time.sleep(0.2)
+    return False
+
+
+def drive(port, bodies, concurrency, duration):
+    stop = threading.Event()
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+
+    def client(i):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        n = i
+        while not stop.is_set():
+            content_type, body = bodies[n % len(bodies)]
+            n += concurrency
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", "/inference/predict", body=body, headers={"Content-Type": content_type})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status >= 500:
+                    errors[i] += 1
+                latencies[i].append(time.perf_counter() - t0)
+            except (OSError, http.client.HTTPException):
+                errors[i] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    values = sorted(v for per_client in latencies for v in per_client)
+
+    def pct(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 1) if values else None
+
+    return {"requests": len(values), "throughput_rps": round(len(values) / elapsed, 2), "errors": sum(errors),
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
+
+
+def run_layout(layout, args, model_path, bodies, cpu_set):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        MODEL_PATH=model_path,
+        PREDICTION_CACHE_SIZE="0",
+        PREDICTION_CACHE_PATH="",
+        GUNICORN_WORKERS=str(layout["workers"]),
+        GUNICORN_THREADS=str(layout["threads"]),
+        TF_INTRA_OP_THREADS=str(layout["intra_op"]),
+        TF_INTER_OP_THREADS=str(layout["inter_op"]),
+        TF_CPP_MIN_LOG_LEVEL="2",
+    )
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "benchmarks.fake_app:app"],
+        env=env, stdout=log, stderr=subprocess.STDOUT, preexec_fn=lambda: os.sched_setaffinity(0, cpu_set),
+    )
+    try:
+        if not wait_ready(port, layout["workers"], args.startup_timeout):
+            log.seek(0)
+            raise SystemExit(f"gunicorn tidak siap:\n{log.read().decode(errors='replace')[-3000:]}")
+        drive(port, bodies, args.concurrency, min(2.0, args.duration))  # warm-up
+        result = drive(port, bodies, args.concurrency, args.duration)
+        result["pss_mb"] = total_pss_mb(proc.pid)
+        return result
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cores", type=int, default=available_cpus())
+    parser.add_argument("--layouts", help="Daftar layout, pisahkan dengan koma (default: grid dari --cores)")
+    parser.add_argument("--model", help="Path model .keras (default: MobileNetV2 pengganti)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--max-p95-ms", type=float, default=1000)
+    parser.add_argument("--startup-timeout", type=float, default=180)
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    cpu_set = sorted(os.sched_getaffinity(0))[:args.cores]
+    if len(cpu_set) < args.cores:
+        raise SystemExit(f"Hanya {len(cpu_set)} CPU tersedia untuk proses ini")
+    layouts = ([parse_layout(t, args.cores) for t in args.layouts.split(",")] if args.layouts
+               else default_layouts(args.cores))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model or stand_in_model(os.path.join(tmp, "stand_in.keras"))
+        bodies = multipart_bodies(args.images, (1280, 960))
+
+        print(f"{args.cores} core, concurrency {args.concurrency}, {args.duration:.0f} s per layout\n")
+        print(f"{'workers':>8} {'threads':>8} {'intra':>6} {'inter':>6} {'req/s':>8} {'p50_ms':>8} "
+              f"{'p95_ms':>8} {'p99_ms':>8} {'pss_mb':>8} {'errors':>7}")
+        results = []
+        for layout in layouts:
+            r = dict(layout, **run_layout(layout, args, model_path, bodies, cpu_set))
+            results.append(r)
+            print(f"{r['workers']:>8} {r['threads']:>8} {r['intra_op']:>6} {r['inter_op']:>6} "
+                  f"{r['throughput_rps']:>8.1f} {r['p50_ms'] or 0:>8.1f} {r['p95_ms'] or 0:>8.1f} "
+                  f"{r['p99_ms'] or 0:>8.1f} {r['pss_mb']:>8.1f} {r['errors']:>7}")
+
+    eligible = [r for r in results if not r["errors"] and r["p95_ms"] is not None and r["p95_ms"] <= args.max_p95_ms]
+    best = max(eligible, key=lambda r: r["throughput_rps"]) if eligible else None
+    if best:
+        print(f"\nRekomendasi untuk {args.cores} core: GUNICORN_WORKERS={best['workers']} "
+              f"GUNICORN_THREADS={best['threads']} TF_INTRA_OP_THREADS={best['intra_op']} "
+              f"TF_INTER_OP_THREADS={best['inter_op']}")
+    else:
+        print(f"\nTidak ada layout tanpa error dengan p95 <= {args.max_p95_ms} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cores": args.cores, "args": vars(args), "results": results, "best": best}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
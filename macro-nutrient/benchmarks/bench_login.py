@@ -0,0 +1,111 @@
+"""Benchmark throughput /auth/login di bawah konkurensi.
+
+Firestore diganti fake in-memory (benchmarks/fakes.py), jadi yang terukur
+hanya Flask + verifikasi password. Sejumlah client bersamaan login berulang kali, sementara satu client "probe" memanggil
+/auth/ (tanpa hashing) untuk melihat apakah request lain ikut tertahan.
+Setiap nilai --workers dijalankan di proses baru karena hasher dibuat saat
+import.
+
+Jalankan dari folder macro-nutrient:
+    python -m benchmarks.bench_login --workers 0,2,4 --clients 8 --seconds 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+CHILD = r"""
+import json, sys, threading, time
+from benchmarks import fakes
+
+fakes.install()
+
+from flask import Flask
+from flask_jwt_extended import JWTManager
+from config import Config
+from routes.auth import auth_bp
+from services.passwords import password_hasher
+
+args = json.loads(sys.argv[1])
+app = Flask(__name__)
+app.config.from_object(Config)
+JWTManager(app)
+app.register_blueprint(auth_bp, url_prefix="/auth")
+
+credentials = {"email": "bench@example.com", "password": "benchmark123"}
+setup = app.test_client()
+assert setup.post("/auth/register", json=dict(credentials, username="bench")).status_code == 201
+token = setup.post("/auth/login", json=credentials).get_json()["result"]["token"]
+
+stop = threading.Event()
+logins, login_lat, probe_lat, errors = [], [], [], []
+
+def login_client():
+    client = app.test_client()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        status = client.post("/auth/login", json=credentials).status_code
+        login_lat.append(time.perf_counter() - t0)
+        (logins if status == 200 else errors).append(status)
+
+def probe_client():
+    client = app.test_client()
+    headers = {"Authorization": "Bearer " + token}
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        client.get("/auth/", headers=headers)
+        probe_lat.append(time.perf_counter() - t0)
+        time.sleep(0.01)
+
+threads = [threading.Thread(target=login_client) for _ in range(args["clients"])]
+threads.append(threading.Thread(target=probe_client))
+start = time.perf_counter()
+for t in threads:
+    t.start()
+time.sleep(args["seconds"])
+stop.set()
+for t in threads:
+    t.join()
+elapsed = time.perf_counter() - start
+password_hasher.shutdown()
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else 0.0
+
+print("RESULT " + json.dumps({
+    "logins_per_s": len(logins) / elapsed, "errors": len(errors),
+    "login_p50_ms": pct(login_lat, 0.5), "login_p95_ms": pct(login_lat, 0.95),
+    "probe_p50_ms": pct(probe_lat, 0.5), "probe_p95_ms": pct(probe_lat, 0.95),
+}))
+"""
+
+
+def run_once(workers, clients, seconds):
+    env = dict(os.environ, PASSWORD_HASH_WORKERS=str(workers), USERS_LEGACY_LOOKUP="false")
+    payload = json.dumps({"clients": clients, "seconds": seconds})
+    proc = subprocess.run([sys.executable, "-c", CHILD, payload], capture_output=True, text=True,
+                          cwd=os.getcwd(), env=env)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise SystemExit(f"Child process gagal:\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="0,2,4", help="Daftar PASSWORD_HASH_WORKERS, pisahkan dengan koma")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'login/s':>8} {'p50_ms':>8} {'p95_ms':>8} {'probe_p50':>10} {'probe_p95':>10} {'errors':>7}")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        r = run_once(workers, args.clients, args.seconds)
+        print(f"{workers:>8} {r['logins_per_s']:>8.1f} {r['login_p50_ms']:>8.1f} {r['login_p95_ms']:>8.1f} "
+              f"{r['probe_p50_ms']:>10.1f} {r['probe_p95_ms']:>10.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
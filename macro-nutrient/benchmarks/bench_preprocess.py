@@ -0,0 +1,125 @@
+"""Benchmark preprocess_image: jalur lama vs jalur cepat.
+
+Jalur lama: decode penuh -> convert RGB -> resize -> img_to_array -> astype
+-> bagi 255. Jalur baru (services.preprocess): JPEG draft decode, satu kali
+resize, normalisasi in-place ke buffer per-thread.
+
+Setiap jalur diukur di proses terpisah (waktu decode dan kenaikan peak RSS),
+lalu output keduanya dibandingkan. Script gagal (exit 1) jika selisih
+melebihi toleransi.
+
+Jalankan dari folder macro-nutrient:
+    python -m benchmarks.bench_preprocess                 # foto sintetis 4032x3024
+    python -m benchmarks.bench_preprocess --images folder # foto sungguhan
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from services.preprocess import preprocess_image
+
+
+def legacy_preprocess(image_bytes, target_size=(224, 224)):
+    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    img = img.resize(target_size)
+    arr = np.asarray(img, dtype="float32") / 255.0  # setara img_to_array(img).astype("float32")
+    return np.expand_dims(arr, axis=0)
+
+
+def fast_preprocess(image_bytes):
+    return preprocess_image(image_bytes).copy()
+
+
+PATHS = {"legacy": legacy_preprocess, "fast": fast_preprocess}
+
+
+def synthetic_jpeg(size=(4032, 3024)):
+    # Gradien + noise agar ukuran file dan isi DCT mirip foto kamera
+    h, w = size[1], size[0]
+    yy, xx = np.mgrid[0:h, 0:w]
+    rgb = np.stack([xx * 255 // w, yy * 255 // h, (xx + yy) * 255 // (w + h)], axis=-1).astype("uint8")
+    rgb = np.clip(rgb + np.random.randint(-20, 20, rgb.shape), 0, 255).astype("uint8")
+    buf = io.BytesIO()
+    Image.fromarray(rgb).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def load_images(folder):
+    if not folder:
+        return [synthetic_jpeg()]
+    images = []
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+            with open(os.path.join(folder, name), "rb") as f:
+                images.append(f.read())
+    return images
+
+
+def peak_rss_kb():
+    # VmHWM direset saat exec, berbeda dengan ru_maxrss yang terbawa dari parent
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return 0
+
+
+def run_path(name, images, iterations, queue):
+    fn = PATHS[name]
+    base_rss = peak_rss_kb()
+    outputs = [fn(image) for image in images]
+    latencies = []
+    for _ in range(iterations):
+        for image in images:
+            start = time.perf_counter()
+            fn(image)
+            latencies.append(time.perf_counter() - start)
+    peak_kb = peak_rss_kb() - base_rss
+    queue.put({"outputs": outputs, "latency_ms": np.array(latencies) * 1000, "peak_mb": peak_kb / 1024})
+
+
+def measure(name, images, iterations):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_path, args=(name, images, iterations, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", help="Folder foto (default: satu JPEG sintetis 12 MP)")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--mean-tolerance", type=float, default=0.02, help="Batas rata-rata |selisih| per piksel")
+    parser.add_argument("--p99-tolerance", type=float, default=0.1, help="Batas persentil 99 |selisih| per piksel")
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    results = {name: measure(name, images, args.iterations) for name in PATHS}
+
+    print(f"{'path':<8} {'mean_ms':>8} {'p99_ms':>8} {'peak_rss_mb':>12}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['latency_ms'].mean():>8.2f} {np.percentile(r['latency_ms'], 99):>8.2f} {r['peak_mb']:>12.1f}")
+
+    diffs = np.concatenate([
+        np.abs(a - b).ravel() for a, b in zip(results["legacy"]["outputs"], results["fast"]["outputs"])
+    ])
+    mean_diff = float(diffs.mean())
+    p99_diff = float(np.percentile(diffs, 99))
+    print(f"\n|legacy - fast|: mean={mean_diff:.4f} p99={p99_diff:.4f} max={diffs.max():.4f}")
+    if mean_diff > args.mean_tolerance or p99_diff > args.p99_tolerance:
+        print("[FAIL] Output preprocess melebihi toleransi.")
+        sys.exit(1)
+    print("[OK] Output preprocess dalam toleransi.")
+
+
+if __name__ == "__main__":
+    main()
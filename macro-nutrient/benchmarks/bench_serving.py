@@ -0,0 +1,63 @@
+"""Benchmark latensi per request: Model.predict vs serving function.
+
+Membandingkan tiga jalur untuk satu gambar (1, 224, 224, 3):
+  - predict          : keras_model.predict(x) (jalur lama)
+  - predict_on_batch : keras_model.predict_on_batch(x)
+  - serving_fn       : ServingFunction (tf.function, signature tetap)
+
+Jalankan dari folder macro-nutrient:
+    python -m benchmarks.bench_serving --model model/modelsl_saved_model.keras
+Tanpa --model, dipakai MobileNetV2 (bobot acak, 5 kelas) sebagai pengganti.
+"""
+import argparse
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from services.serving import ServingFunction
+
+
+def measure(fn, x, iterations):
+    fn(x)  # panggilan pertama (tracing/setup) tidak dihitung
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(x)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Path model .keras (default: MobileNetV2 acak)")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.model:
+        model = tf.keras.models.load_model(args.model)
+    else:
+        model = tf.keras.applications.MobileNetV2(weights=None, classes=5, input_shape=(224, 224, 3))
+
+    x = np.random.rand(1, 224, 224, 3).astype("float32")
+    serving_fn = ServingFunction(model)
+
+    start = time.perf_counter()
+    serving_fn.warmup([1])
+    print(f"serving_fn warm-up (tracing): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    candidates = {
+        "predict": lambda v: model.predict(v, verbose=0),
+        "predict_on_batch": model.predict_on_batch,
+        "serving_fn": serving_fn,
+    }
+    print(f"{'path':<18} {'mean_ms':>8} {'p50_ms':>8} {'p99_ms':>8}")
+    for name, fn in candidates.items():
+        ms = measure(fn, x, args.iterations)
+        print(f"{name:<18} {ms.mean():>8.2f} {np.percentile(ms, 50):>8.2f} {np.percentile(ms, 99):>8.2f}")
+
+    np.testing.assert_allclose(serving_fn(x), model.predict_on_batch(x), rtol=1e-4, atol=1e-5)
+
+
+if __name__ == "__main__":
+    main()
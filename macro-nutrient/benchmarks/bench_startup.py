@@ -0,0 +1,83 @@
+"""Benchmark cold start: waktu import app dan time-to-first-prediction.
+
+Setiap percobaan berjalan di proses Python baru:
+  import_s      : waktu ``import app`` (Flask, blueprint, konfigurasi)
+  ready_s       : sejak awal proses sampai /ready mengembalikan 200
+  first_pred_s  : sampai POST /inference/predict pertama selesai (tanpa login,
+                  jadi tidak menyentuh GCS/Firestore)
+
+Jalankan dari folder macro-nutrient:
+    python -m benchmarks.bench_startup --runs 3
+    MODEL_PATH=/path/model.keras python -m benchmarks.bench_startup --importtime
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+CHILD = r"""
+import io, json, time
+t0 = time.perf_counter()
+import app as app_module
+t_import = time.perf_counter() - t0
+
+from PIL import Image
+client = app_module.app.test_client()
+app_module.app.config["MODEL_READY"].wait()
+status = client.get("/ready").status_code
+t_ready = time.perf_counter() - t0
+
+buf = io.BytesIO()
+Image.new("RGB", (1024, 768), (180, 120, 60)).save(buf, "JPEG")
+resp = client.post("/inference/predict", data={"image": (io.BytesIO(buf.getvalue()), "warm.jpg")})
+t_first = time.perf_counter() - t0
+print("RESULT " + json.dumps({
+    "import_s": t_import, "ready_s": t_ready, "first_pred_s": t_first,
+    "ready_status": status, "predict_status": resp.status_code,
+}))
+"""
+
+
+def run_once(importtime):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", CHILD]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd())
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            result = json.loads(line[len("RESULT "):])
+    if result is None:
+        raise SystemExit(f"Child process gagal:\n{proc.stderr[-2000:]}")
+    imports = []
+    if importtime:
+        for line in proc.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                parts = [p.strip() for p in line[len("import time:"):].split("|")]
+                if parts[1].isdigit():
+                    imports.append((int(parts[1]), parts[2].strip()))
+    return result, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--importtime", action="store_true", help="Tampilkan modul dengan import paling lama")
+    args = parser.parse_args()
+
+    print(f"{'run':>4} {'import_s':>9} {'ready_s':>8} {'first_pred_s':>13} {'ready':>6} {'predict':>8}")
+    for i in range(args.runs):
+        r, imports = run_once(args.importtime and i == 0)
+        print(f"{i + 1:>4} {r['import_s']:>9.3f} {r['ready_s']:>8.3f} {r['first_pred_s']:>13.3f} "
+              f"{r['ready_status']:>6} {r['predict_status']:>8}")
+        if imports:
+            print("\nImport kumulatif terlama (ms):")
+            for us, name in sorted(imports, reverse=True)[:15]:
+                print(f"  {us / 1000:>8.1f}  {name.strip()}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
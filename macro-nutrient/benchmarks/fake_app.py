@@ -0,0 +1,22 @@
+"""Entry point gunicorn dengan Firestore/GCS in-memory, untuk benchmark.
+
+    gunicorn -c gunicorn.conf.py benchmarks.fake_app:app
+
+Dengan SERVER_INTERFACE=asgi, ``app`` adalah app ASGI (asgi.py). Env opsional:
+FAKE_FIRESTORE_LATENCY_MS (jeda per RPC), FAKE_SEED_PREDICTIONS (jumlah
+prediksi user benchmark, lihat fakes.seed; dibuat sebelum fork sehingga ada di
+setiap worker), FAKE_SEED_EMAIL dan FAKE_SEED_PASSWORD.
+"""
+import os
+
+from benchmarks import fakes
+
+db, _ = fakes.install(float(os.getenv("FAKE_FIRESTORE_LATENCY_MS", 0)))
+if os.getenv("FAKE_SEED_PREDICTIONS"):
+    fakes.seed(db, os.getenv("FAKE_SEED_EMAIL", "bench@example.com"), os.getenv("FAKE_SEED_PASSWORD", "benchmark123"),
+               predictions=int(os.environ["FAKE_SEED_PREDICTIONS"]))
+
+if os.getenv("SERVER_INTERFACE", "wsgi").lower() == "asgi":
+    from asgi import app  # noqa: E402,F401
+else:
+    from app import app  # noqa: E402,F401
@@ -0,0 +1,396 @@
+"""Pengganti Firestore dan GCS in-memory untuk benchmark dan load test.
+
+Hanya subset API yang dipakai aplikasi yang diimplementasikan: document
+get/set/create/update/delete, query where(==, in)/order_by/select/start_after/
+limit/stream, batch write, get_all, serta transform SERVER_TIMESTAMP dan
+Increment; ``AsyncFakeFirestore`` menyediakan subset yang sama untuk
+AsyncClient (route ASGI). ``latency_ms`` menambahkan jeda per RPC agar
+mendekati kondisi jaringan nyata. Pasang dengan ``install()`` sebelum
+request pertama.
+"""
+import asyncio
+import copy
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import numpy as np
+from google.api_core.exceptions import AlreadyExists, NotFound, PreconditionFailed
+from google.cloud import firestore
+from google.cloud.firestore_v1.transforms import Increment
+
+from config import Config
+from services import clients
+
+
+def _resolve(value, previous=None):
+    if value is firestore.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, Increment):
+        return (previous or 0) + value.value
+    if isinstance(value, dict):
+        return {k: _resolve(v, (previous or {}).get(k) if isinstance(previous, dict) else None)
+                for k, v in value.items()}
+    return value
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return self._data.get(field) if self._data is not None else None
+
+
+class FakeDocument:
+    def __init__(self, db, collection, doc_id):
+        self._db = db
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def _store(self):
+        return self._db.data.setdefault(self._collection, {})
+
+    def get(self, field_paths=None):
+        self._db.rpc()
+        with self._db.lock:
+            return FakeSnapshot(self, copy.deepcopy(self._store.get(self.id)))
+
+    def _write(self, data, merge=False):
+        with self._db.lock:
+            previous = self._store.get(self.id)
+            if merge and previous is not None:
+                merged = dict(previous)
+                merged.update(_resolve(data, previous))
+                self._store[self.id] = merged
+            else:
+                self._store[self.id] = _resolve(copy.deepcopy(data))
+
+    def set(self, data, merge=False):
+        self._db.rpc()
+        self._write(data, merge)
+
+    def create(self, data):
+        self._db.rpc()
+        with self._db.lock:
+            if self.id in self._store:
+                raise AlreadyExists(f"Document already exists: {self._collection}/{self.id}")
+            self._store[self.id] = _resolve(copy.deepcopy(data))
+
+    def update(self, data):
+        self._db.rpc()
+        with self._db.lock:
+            if self.id not in self._store:
+                raise NotFound(f"No document to update: {self._collection}/{self.id}")
+        self._write(data, merge=True)
+
+    def delete(self):
+        self._db.rpc()
+        with self._db.lock:
+            self._store.pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(self, db, collection, filters=(), orders=(), fields=None, cursor=None, limit_count=None):
+        self._db = db
+        self._collection = collection
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._fields = fields
+        self._cursor = cursor
+        self._limit = limit_count
+
+    def _copy(self, **changes):
+        state = dict(filters=self._filters, orders=self._orders, fields=self._fields,
+                     cursor=self._cursor, limit_count=self._limit)
+        state.update(changes)
+        return FakeQuery(self._db, self._collection, **state)
+
+    def where(self, field, op, value):
+        if op not in ("==", "in"):
+            raise NotImplementedError(f"FakeQuery hanya mendukung '==' dan 'in', bukan {op!r}")
+        values = tuple(value) if op == "in" else (value,)
+        return self._copy(filters=self._filters + ((field, values),))
+
+    def order_by(self, field, direction=firestore.Query.ASCENDING):
+        return self._copy(orders=self._orders + ((field, direction == firestore.Query.DESCENDING),))
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def start_after(self, values):
+        return self._copy(cursor=values)
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def _sort_key(self, doc_id, data, field):
+        return doc_id if field == "__name__" else data.get(field)
+
+    def stream(self):
+        self._db.rpc()
+        def after_cursor(row):
+            for field, descending in self._orders:
+                value, bound = self._sort_key(row[0], row[1], field), self._cursor.get(field)
+                if value != bound:
+                    return value < bound if descending else value > bound
+            return False
+
+        with self._db.lock:
+            rows = [(doc_id, data) for doc_id, data in self._db.data.get(self._collection, {}).items()
+                    if all(data.get(field) in values for field, values in self._filters)]
+            for field, descending in reversed(self._orders):
+                rows.sort(key=lambda row: self._sort_key(row[0], row[1], field), reverse=descending)
+            if self._cursor is not None:
+                rows = [row for row in rows if after_cursor(row)]
+            if self._limit is not None:
+                rows = rows[:self._limit]
+            rows = [(doc_id, copy.deepcopy(data)) for doc_id, data in rows]
+        for doc_id, data in rows:
+            if self._fields is not None:
+                data = {k: v for k, v in data.items() if k in self._fields}
+            yield FakeSnapshot(FakeDocument(self._db, self._collection, doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, name):
+        super().__init__(db, name)
+
+    def document(self, doc_id):
+        return FakeDocument(self._db, self._collection, doc_id)
+
+    def add(self, data):
+        doc = self.document(f"auto{next(self._db.ids):020d}")
+        doc.set(data)
+        return None, doc
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, reference, data, merge=False):
+        self._writes.append((reference, data, merge, False))
+
+    def create(self, reference, data):
+        self._writes.append((reference, data, False, True))
+
+    def commit(self):
+        self._db.rpc()
+        # Atomik seperti Firestore: satu create yang gagal membatalkan seluruh batch
+        with self._db.lock:
+            for reference, _, _, create in self._writes:
+                if create and reference.id in reference._store:
+                    raise AlreadyExists(f"Document already exists: {reference._collection}/{reference.id}")
+        for reference, data, merge, _ in self._writes:
+            reference._write(data, merge)
+        self._writes = []
+
+
+class FakeFirestore:
+    def __init__(self, latency_ms=0.0):
+        self.latency = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.data = {}
+        self.rpcs = 0
+        self.ids = iter(range(1, 1 << 62))
+
+    def rpc(self):
+        self.rpcs += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def get_all(self, references):
+        self.rpc()
+        with self.lock:
+            return [FakeSnapshot(ref, copy.deepcopy(self.data.get(ref._collection, {}).get(ref.id)))
+                    for ref in references]
+
+
+class AsyncFakeDocument:
+    def __init__(self, adb, document):
+        self._adb = adb
+        self._document = document
+        self.id = document.id
+
+    async def get(self, field_paths=None):
+        await self._adb.rpc()
+        return self._adb.wrap(self._document.get(field_paths))
+
+    async def set(self, data, merge=False):
+        await self._adb.rpc()
+        self._document.set(data, merge)
+
+    async def create(self, data):
+        await self._adb.rpc()
+        self._document.create(data)
+
+    async def update(self, data):
+        await self._adb.rpc()
+        self._document.update(data)
+
+    async def delete(self):
+        await self._adb.rpc()
+        self._document.delete()
+
+
+class AsyncFakeQuery:
+    def __init__(self, adb, query):
+        self._adb = adb
+        self._query = query
+
+    def __getattr__(self, name):
+        # where/order_by/select/start_after/limit: bangun query sync lalu bungkus lagi
+        method = getattr(self._query, name)
+        return lambda *args, **kwargs: AsyncFakeQuery(self._adb, method(*args, **kwargs))
+
+    async def stream(self):
+        await self._adb.rpc()
+        for snapshot in list(self._query.stream()):
+            yield self._adb.wrap(snapshot)
+
+    async def get(self):
+        return [snapshot async for snapshot in self.stream()]
+
+
+class AsyncFakeCollection(AsyncFakeQuery):
+    def document(self, doc_id):
+        return AsyncFakeDocument(self._adb, self._query.document(doc_id))
+
+
+class AsyncFakeFirestore:
+    """Pengganti firestore.AsyncClient di atas data FakeFirestore yang sama.
+
+    Latensi RPC disimulasikan dengan ``asyncio.sleep`` (tidak memblokir
+    event loop); operasi data dijalankan lewat salinan FakeFirestore tanpa
+    latensi.
+    """
+
+    def __init__(self, db):
+        self.latency = db.latency
+        self._db = copy.copy(db)
+        self._db.latency = 0.0
+
+    async def rpc(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def wrap(self, snapshot):
+        snapshot.reference = AsyncFakeDocument(self, snapshot.reference)
+        return snapshot
+
+    def collection(self, name):
+        return AsyncFakeCollection(self, self._db.collection(name))
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.public_url = f"https://storage.googleapis.com/{bucket.name}/{name}"
+
+    def upload_from_string(self, data, content_type=None, if_generation_match=None, **kwargs):
+        self.bucket.rpc()
+        with self.bucket.lock:
+            if if_generation_match == 0 and self.name in self.bucket.objects:
+                raise PreconditionFailed(f"{self.name} sudah ada")
+            self.bucket.objects[self.name] = (bytes(data), content_type)
+
+    def make_public(self):
+        self.bucket.rpc()
+
+    def exists(self):
+        self.bucket.rpc()
+        return self.name in self.bucket.objects
+
+
+class FakeBucket:
+    def __init__(self, name, latency_ms=0.0):
+        self.name = name
+        self.latency = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.objects = {}
+
+    def rpc(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+
+def install(firestore_latency_ms=0.0, gcs_latency_ms=0.0, use_emulator=False):
+    """Pasang fake lewat services.clients.override; hasil (firestore, bucket).
+
+    Dengan ``use_emulator`` Firestore tidak diganti sehingga client asli
+    memakai FIRESTORE_EMULATOR_HOST; hanya GCS yang dipalsukan.
+    """
+    db = None
+    if not use_emulator:
+        db = FakeFirestore(firestore_latency_ms)
+        clients.override("firestore", db)
+        clients.override("async_firestore", AsyncFakeFirestore(db))
+    bucket = FakeBucket(Config.GCS_BUCKET_NAME, gcs_latency_ms)
+    clients.override(f"bucket:{Config.GCS_BUCKET_NAME}", bucket)
+    clients.override("storage", SimpleNamespace(bucket=lambda name: bucket))
+    return db, bucket
+
+
+def seed(db, email, password, username="bench", predictions=0):
+    """Isi FakeFirestore dengan satu user dan ``predictions`` prediksi miliknya.
+
+    Dipakai sebelum fork gunicorn (preload) agar setiap worker punya data yang
+    sama; id prediksi ``bench000000``, ``bench000001``, dan seterusnya.
+    """
+    from werkzeug.security import generate_password_hash
+
+    users = db.data.setdefault("users", {})
+    users[email.strip().lower()] = {
+        "username": username, "email": email,
+        "password": generate_password_hash(password, method=Config.PASSWORD_HASH_METHOD),
+    }
+    docs = db.data.setdefault("predictions", {})
+    now = datetime.now(timezone.utc)
+    for i in range(predictions):
+        created_at = now - timedelta(minutes=i)
+        docs[f"bench{i:06d}"] = {
+            "user_id": username, "label": "burger", "confidence": 92.0,
+            "created_at": created_at, "updated_at": created_at,
+            "facts": {"calories": 295, "protein": 17.0, "carbohydrates": 24.0, "fat": 14.0},
+            "image": {"filename": f"images/bench{i:06d}.webp",
+                      "public_url": f"https://storage.googleapis.com/{Config.GCS_BUCKET_NAME}/images/bench{i:06d}.webp"},
+        }
+
+
+class FakeModel:
+    """Pengganti model: kelas ditentukan dari rata-rata piksel, confidence 92%.
+
+    Untuk mengukur overhead aplikasi tanpa biaya model asli.
+    """
+
+    def __init__(self, num_classes=5):
+        self.num_classes = num_classes
+
+    def __call__(self, x):
+        means = x.reshape(len(x), -1).mean(axis=1)
+        preds = np.full((len(x), self.num_classes), 0.08 / (self.num_classes - 1), dtype="float32")
+        preds[np.arange(len(x)), (means * 1000).astype(int) % self.num_classes] = 0.92
+        return preds
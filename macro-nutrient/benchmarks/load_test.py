@@ -0,0 +1,233 @@
+"""Load test aplikasi Flask dengan Firestore/GCS in-memory (benchmarks/fakes.py).
+
+Aplikasi (``app.py``) di-import di proses ini setelah client Firestore/GCS
+diganti fake, lalu setiap skenario dijalankan oleh ``--concurrency`` thread
+selama ``--duration`` detik lewat WSGI test client (tanpa socket). Untuk
+setiap skenario dilaporkan throughput, latensi p50/p95/p99, status HTTP dan
+RSS; hasilnya disimpan sebagai JSON untuk dibandingkan antar commit.
+
+Skenario: predict, predict_login (ikut upload + tulis Firestore), history,
+get (GET /inference/<id>), login.
+
+Jalankan dari folder macro-nutrient:
+    python -m benchmarks.load_test --fake-model --concurrency 8 --duration 10
+    python -m benchmarks.load_test --scenarios predict,history --firestore-latency-ms 20
+    python -m benchmarks.load_test --fake-model --compare benchmarks/results/<file sebelumnya>.json
+Dengan --emulator, Firestore memakai FIRESTORE_EMULATOR_HOST (GCS tetap fake).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+
+SCENARIOS = ("predict", "predict_login", "history", "get", "login")
+EMAIL = "loadtest@example.com"
+PASSWORD = "loadtest123"
+
+
+def memory_mb():
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                values[line.split(":")[0]] = int(line.split()[1]) / 1024
+    return {"rss_mb": round(values.get("VmRSS", 0.0), 1), "peak_rss_mb": round(values.get("VmHWM", 0.0), 1)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_images(count, size):
+    from PIL import Image
+
+    rng = random.Random(0)
+    images = []
+    for _ in range(count):
+        buf = io.BytesIO()
+        color = tuple(rng.randrange(256) for _ in range(3))
+        Image.new("RGB", size, color).save(buf, "JPEG", quality=90)
+        images.append(buf.getvalue())
+    return images
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] * 1000, 2)
+
+
+def run_scenario(app, request_fn, concurrency, duration):
+    stop = threading.Event()
+    latencies = [[] for _ in range(concurrency)]
+    statuses = [{} for _ in range(concurrency)]
+
+    def worker(i):
+        client = app.test_client()
+        n = 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            status = request_fn(client, n)
+            latencies[i].append(time.perf_counter() - t0)
+            statuses[i][status] = statuses[i].get(status, 0) + 1
+            n += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = sorted(v for values in latencies for v in values)
+    status_counts = {}
+    for counts in statuses:
+        for status, count in counts.items():
+            status_counts[str(status)] = status_counts.get(str(status), 0) + count
+    return {
+        "requests": len(all_latencies),
+        "throughput_rps": round(len(all_latencies) / elapsed, 2),
+        "p50_ms": percentile(all_latencies, 0.50),
+        "p95_ms": percentile(all_latencies, 0.95),
+        "p99_ms": percentile(all_latencies, 0.99),
+        "status": status_counts,
+        **memory_mb(),
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nDibandingkan dengan {baseline_path} (commit {baseline.get('commit')}):")
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        parts = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"):
+            if before.get(key) and current.get(key) is not None:
+                parts.append(f"{key} {(current[key] - before[key]) / before[key] * 100:+.1f}%")
+        print(f"  {name:<14} " + ", ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--images", type=int, default=64, help="Jumlah gambar berbeda yang dikirim bergantian")
+    parser.add_argument("--image-size", default="1280x960")
+    parser.add_argument("--seed-predictions", type=int, default=200, help="Prediksi awal untuk history/get")
+    parser.add_argument("--firestore-latency-ms", type=float, default=0)
+    parser.add_argument("--gcs-latency-ms", type=float, default=0)
+    parser.add_argument("--fake-model", action="store_true", help="Ganti model dengan FakeModel (tanpa TensorFlow)")
+    parser.add_argument("--no-cache", action="store_true", help="Matikan prediction cache")
+    parser.add_argument("--emulator", action="store_true", help="Pakai Firestore emulator (FIRESTORE_EMULATOR_HOST)")
+    parser.add_argument("--output", help="File JSON hasil (default benchmarks/results/<waktu>_<commit>.json)")
+    parser.add_argument("--compare", help="File JSON hasil sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Skenario tidak dikenal: {', '.join(sorted(unknown))}")
+
+    # Konfigurasi dibaca saat import, jadi env harus diset sebelum import app
+    if args.no_cache:
+        os.environ["PREDICTION_CACHE_SIZE"] = "0"
+    if args.fake_model:
+        os.environ["INFERENCE_BACKEND"] = "none"
+    if args.emulator and not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        raise SystemExit("--emulator membutuhkan FIRESTORE_EMULATOR_HOST")
+
+    from benchmarks import fakes
+
+    fakes.install(args.firestore_latency_ms, args.gcs_latency_ms, use_emulator=args.emulator)
+    import app as app_module
+    import routes.inference as inference
+
+    app = app_module.app
+    app.config["MODEL_READY"].wait()
+    if args.fake_model:
+        app.config["SERVING_FN"] = fakes.FakeModel(len(inference.CLASS_NAMES))
+        app.config.pop("INFERENCE_BATCHER", None)
+    if app.config.get("SERVING_FN") is None and app.config.get("KERAS_MODEL") is None:
+        raise SystemExit("Model tidak tersedia; set MODEL_PATH atau pakai --fake-model")
+
+    width, height = (int(v) for v in args.image_size.split("x"))
+    images = make_images(args.images, (width, height))
+
+    setup = app.test_client()
+    setup.post("/auth/register", json={"email": EMAIL, "username": "loadtest", "password": PASSWORD})
+    token = setup.post("/auth/login", json={"email": EMAIL, "password": PASSWORD}).get_json()["result"]["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    prediction_ids = []
+    for i in range(args.seed_predictions):
+        data = {"image": (io.BytesIO(images[i % len(images)]), f"seed{i}.jpg")}
+        result = setup.post("/inference/predict", headers=headers, data=data).get_json().get("result") or {}
+        if result.get("id"):
+            prediction_ids.append(result["id"])
+    if inference.persistence_queue is not None:
+        inference.persistence_queue.drain(60)
+    if not prediction_ids and {"history", "get"} & set(scenarios):
+        print("[WARN] Tidak ada prediksi awal yang tersimpan (confidence di bawah threshold?).")
+
+    def predict(client, n, auth=None):
+        data = {"image": (io.BytesIO(images[n % len(images)]), "load.jpg")}
+        return client.post("/inference/predict", headers=auth, data=data).status_code
+
+    request_fns = {
+        "predict": predict,
+        "predict_login": lambda client, n: predict(client, n, headers),
+        "history": lambda client, n: client.get("/inference/history?limit=20", headers=headers).status_code,
+        "get": lambda client, n: client.get(
+            f"/inference/{prediction_ids[n % len(prediction_ids)] if prediction_ids else 'missing'}").status_code,
+        "login": lambda client, n: client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD}).status_code,
+    }
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "args": vars(args),
+        "config": {key: app.config.get(key) for key in (
+            "INFERENCE_BACKEND", "BATCHING_ENABLED", "BATCH_MAX_SIZE", "BATCH_MAX_WAIT_MS",
+            "PREDICTION_CACHE_SIZE", "PERSISTENCE_ASYNC", "PASSWORD_HASH_WORKERS")},
+        "startup": {"model_load_seconds": app.config.get("MODEL_LOAD_SECONDS"), **memory_mb()},
+        "scenarios": {},
+    }
+
+    print(f"{'scenario':<14} {'req/s':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'rss_mb':>8}  status")
+    for name in scenarios:
+        r = run_scenario(app, request_fns[name], args.concurrency, args.duration)
+        if inference.persistence_queue is not None:
+            inference.persistence_queue.drain(60)
+        results["scenarios"][name] = r
+        print(f"{name:<14} {r['throughput_rps']:>8.1f} {r['p50_ms'] or 0:>8.1f} {r['p95_ms'] or 0:>8.1f} "
+              f"{r['p99_ms'] or 0:>8.1f} {r['rss_mb']:>8.1f}  {r['status']}")
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"{time.strftime('%Y%m%d-%H%M%S')}_{results['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"\n[INFO] Hasil disimpan di {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,105 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'BebekGorengH.Slamet')  # Akan override lewat --set-env-vars
     PROJECT_ID = 'macro-nutrient'
     DATABASE_ID = 'macronutrient'
-    
+    GCS_BUCKET_NAME = os.getenv('GCS_BUCKET_NAME', 'mymlbucket017')
+    # Gambar history disimpan sebagai versi kecil (webp/jpeg) dengan nama = SHA-256 upload.
+    # Akses publik diatur di level bucket (uniform access) atau lewat IMAGE_PUBLIC_BASE_URL (mis. CDN)
+    IMAGE_DERIVATIVE_FORMAT = os.getenv('IMAGE_DERIVATIVE_FORMAT', 'webp').lower()
+    IMAGE_DERIVATIVE_MAX_SIDE = int(os.getenv('IMAGE_DERIVATIVE_MAX_SIDE', 640))
+    IMAGE_DERIVATIVE_QUALITY = int(os.getenv('IMAGE_DERIVATIVE_QUALITY', 80))
+    IMAGE_PUBLIC_BASE_URL = os.getenv('IMAGE_PUBLIC_BASE_URL')
+
+    # Muat model di background thread; status terlihat di /ready
+    MODEL_LOAD_IN_BACKGROUND = os.getenv('MODEL_LOAD_IN_BACKGROUND', 'true').lower() == 'true'
+    # Diset oleh gunicorn.conf.py saat preload_app: model dimuat per worker setelah fork
+    MODEL_LOAD_AFTER_FORK = os.getenv('MODEL_LOAD_AFTER_FORK', 'false').lower() == 'true'
+
+    MODEL_PATH = os.getenv('MODEL_PATH', os.path.join(os.path.dirname(__file__), 'model', 'modelsl_saved_model.keras'))
+    # Backend inference: "keras", "tflite" (lihat scripts/convert_tflite.py) atau "none" (tanpa model)
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'keras').lower()
+    TFLITE_MODEL_PATH = os.getenv('TFLITE_MODEL_PATH', os.path.join(os.path.dirname(__file__), 'model', 'model_float16.tflite'))
+    # 0 = ikut TF_INTRA_OP_THREADS (per worker), atau semua CPU jika tidak diset
+    TFLITE_NUM_THREADS = int(os.getenv('TFLITE_NUM_THREADS', 0))
+
+    # Micro-batching untuk inference /inference/predict
+    BATCHING_ENABLED = os.getenv('BATCHING_ENABLED', 'true').lower() == 'true'
+    BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 16))
+    BATCH_MAX_WAIT_MS = float(os.getenv('BATCH_MAX_WAIT_MS', 5))
+    # Ukuran batch dummy untuk warm-up serving function saat startup
+    WARMUP_BATCH_SIZES = [int(n) for n in os.getenv('WARMUP_BATCH_SIZES', '1,2,4,8,16').split(',')]
+    # Cache prediksi per hash gambar; isi PREDICTION_CACHE_PATH (file SQLite)
+    # agar cache dibagi antar worker gunicorn
+    PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 1024))
+    PREDICTION_CACHE_PATH = os.getenv('PREDICTION_CACHE_PATH')
+    # Write-behind: upload GCS + tulis Firestore di background setelah response
+    PERSISTENCE_ASYNC = os.getenv('PERSISTENCE_ASYNC', 'true').lower() == 'true'
+    PERSISTENCE_WORKERS = int(os.getenv('PERSISTENCE_WORKERS', 4))
+    PERSISTENCE_QUEUE_SIZE = int(os.getenv('PERSISTENCE_QUEUE_SIZE', 256))
+    PERSISTENCE_MAX_RETRIES = int(os.getenv('PERSISTENCE_MAX_RETRIES', 3))
+    PERSISTENCE_DRAIN_TIMEOUT = float(os.getenv('PERSISTENCE_DRAIN_TIMEOUT', 20))
+    # Cache response /inference/<id> dan /inference/history per proses (0 = nonaktif).
+    # History diinvalidasi saat prediksi baru user tersimpan di worker yang sama;
+    # worker lain mengikuti paling lambat setelah READ_CACHE_TTL detik
+    READ_CACHE_SIZE = int(os.getenv('READ_CACHE_SIZE', 2048))
+    READ_CACHE_TTL = float(os.getenv('READ_CACHE_TTL', 15))
+    READ_CACHE_DOC_TTL = float(os.getenv('READ_CACHE_DOC_TTL', 3600))
+    # Mirror SQLite lokal koleksi predictions untuk history (kosong = nonaktif).
+    # Diisi write-through + scripts/sync_prediction_mirror.py; MAX_AGE (detik) membuat
+    # user dianggap dingin lagi jika sync terakhir terlalu lama. 0 = tanpa batas,
+    # hanya aman untuk satu instance (write-through instance lain tidak masuk ke sini)
+    PREDICTION_MIRROR_PATH = os.getenv('PREDICTION_MIRROR_PATH')
+    PREDICTION_MIRROR_MAX_AGE = float(os.getenv('PREDICTION_MIRROR_MAX_AGE', 300))
+    # Pagination /inference/history
+    HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', 50))
+    HISTORY_MAX_PAGE_SIZE = int(os.getenv('HISTORY_MAX_PAGE_SIZE', 200))
+    # Agregat nutrisi harian: batas hari mengikuti zona waktu lokal (WIB = UTC+7)
+    SUMMARY_UTC_OFFSET_HOURS = float(os.getenv('SUMMARY_UTC_OFFSET_HOURS', 7))
+    SUMMARY_MAX_DAYS = int(os.getenv('SUMMARY_MAX_DAYS', 366))
+
+    # Cache token JWT yang sudah diverifikasi (0 = nonaktif)
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 4096))
+    TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 300))
+
+    # Hashing password di process pool terpisah (0 worker = langsung di thread request)
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+    # Cari juga dokumen user lama (id acak) lewat query email jika id email belum ada
+    USERS_LEGACY_LOOKUP = os.getenv('USERS_LEGACY_LOOKUP', 'true').lower() == 'true'
+
+    # Header Server-Timing per tahap (tanpa tahap auth); profil stack untuk sebagian request lambat (0 = nonaktif)
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+    # Token (Authorization: Bearer) untuk /metrics dan /inference/stats; kosong = keduanya 404
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    PROFILE_SLOW_REQUEST_MS = float(os.getenv('PROFILE_SLOW_REQUEST_MS', 0))
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0.05))
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))
+
+    # Jumlah gambar maksimal untuk /inference/predict/batch
+    MAX_BATCH_IMAGES = int(os.getenv('MAX_BATCH_IMAGES', 16))
+    # Jumlah kandidat maksimal untuk ?top_k= (dihitung sekali per gambar dan ikut di-cache)
+    TOP_K_MAX = int(os.getenv('TOP_K_MAX', 5))
+    # true jika output model berupa logits (tanpa aktivasi softmax di layer terakhir)
+    MODEL_OUTPUT_LOGITS = os.getenv('MODEL_OUTPUT_LOGITS', 'false').lower() == 'true'
+
+    # Cascade: gate murah pada thumbnail menolak gambar yang jelas bukan makanan
+    # sebelum model utama. "off", "heuristic" (warna) atau "model" (TFLite kecil)
+    FOOD_GATE = os.getenv('FOOD_GATE', 'off').lower()
+    FOOD_GATE_MIN_FOOD_FRACTION = float(os.getenv('FOOD_GATE_MIN_FOOD_FRACTION', 0.05))
+    FOOD_GATE_MIN_SATURATION = float(os.getenv('FOOD_GATE_MIN_SATURATION', 0.15))
+    FOOD_GATE_MODEL_PATH = os.getenv('FOOD_GATE_MODEL_PATH', os.path.join(os.path.dirname(__file__), 'model', 'food_gate.tflite'))
+    FOOD_GATE_THRESHOLD = float(os.getenv('FOOD_GATE_THRESHOLD', 0.2))
+
+    # Admission control /inference/predict(/batch): request berjalan bersamaan
+    # per worker, antrean tunggu, lalu 503 + Retry-After (0 = nonaktif)
+    ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', 8))
+    ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', 8))
+    ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_MS', 2000))
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 1))
+    # Batas ukuran body per gambar; dicek dari Content-Length sebelum body dibaca
+    MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_MB', 10)) * 1024 * 1024
+    MAX_CONTENT_LENGTH = MAX_UPLOAD_BYTES * MAX_BATCH_IMAGES
+
 class CorsConfig:
     def __init__(self, app=None):
         if app is not None:
@@ -0,0 +1,62 @@
+# gunicorn.conf.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.serving_profile import INTER_OP_ENV, INTRA_OP_ENV, serving_layout  # noqa: E402
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+# Beri waktu antrean persistence menyelesaikan upload/tulis saat shutdown
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+# "wsgi": app Flask di worker gthread. "asgi": asgi.py di worker uvicorn; route
+# yang hanya menunggu Firestore berjalan async, route lain (predict) tetap di
+# Flask lewat thread pool sebesar GUNICORN_THREADS
+server_interface = os.getenv("SERVER_INTERFACE", "wsgi").lower()
+# Dipakai jika app tidak diberikan di command line
+wsgi_app = "asgi:app" if server_interface == "asgi" else "app:app"
+
+# Layout worker x thread dari jumlah CPU (override lewat env, lihat
+# services/serving_profile.py dan benchmarks/bench_layout.py)
+layout = serving_layout()
+worker_class = "uvicorn_worker.UvicornWorker" if server_interface == "asgi" else "gthread"
+workers = layout["workers"]
+threads = layout["threads"]
+
+# Thread TensorFlow per worker, dibaca model_loader saat model dimuat
+os.environ.setdefault(INTRA_OP_ENV, str(layout["intra_op"]))
+os.environ.setdefault(INTER_OP_ENV, str(layout["inter_op"]))
+
+# Preload: app, dataset dan modul TensorFlow di-import sekali di master lalu
+# dibagi copy-on-write ke worker; model dimuat per worker setelah fork
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+if preload_app:
+    os.environ.setdefault("MODEL_LOAD_AFTER_FORK", "true")
+
+
+def when_ready(server):
+    server.log.info(
+        f"Serving layout ({server_interface}): {layout['cpus']} CPU, {workers} worker(s) x {threads} thread(s), "
+        f"TF intra_op={os.environ[INTRA_OP_ENV]} inter_op={os.environ[INTER_OP_ENV]}, preload={preload_app}"
+    )
+
+
+def post_fork(server, worker):
+    if os.environ.get("MODEL_LOAD_AFTER_FORK") == "true":
+        # Dengan worker uvicorn, worker.app.wsgi() adalah app ASGI; model dimuat ke app Flask
+        from app import app
+        from services.model_loader import start_worker_model_loading
+
+        start_worker_model_loading(app)
+
+
+def worker_exit(server, worker):
+    # Kosongkan antrean write-behind sebelum worker berhenti (SIGTERM Cloud Run)
+    from config import Config
+    from routes.inference import persistence_queue
+
+    if persistence_queue is not None:
+        pending = persistence_queue.drain(timeout=Config.PERSISTENCE_DRAIN_TIMEOUT)
+        server.log.info(f"Persistence queue drained ({pending} job(s) left) for worker {worker.pid}")
@@ -57,12 +57,15 @@
 
 import re
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
-from google.cloud import firestore
+from flask_jwt_extended import create_access_token
+from google.api_core.exceptions import AlreadyExists
+from services.auth_tokens import get_jwt_identity, jwt_required
+from services.clients import get_firestore
+from services.metrics import timed
+from services.passwords import PasswordPoolBusy, password_hasher
+from config import Config
 
 auth_bp = Blueprint('auth', __name__)
-db = firestore.Client(project="macro-nutrient")  # Ubah sesuai ID proyek GCP kamu jika beda
 
 def is_valid_email(email):
     return re.match(r'^[\w\.-]+@[\w\.-]+\.\w+$', email)
@@ -70,6 +73,51 @@ def is_valid_email(email):
 def is_valid_password(password):
     return re.match(r'^(?=.*[A-Za-z])(?=.*[\d\W])[A-Za-z\d\W]{8,}$', password)
 
+# Dokumen user disimpan dengan id = email yang dinormalisasi (get langsung, tanpa query)
+def normalize_email(email):
+    return email.strip().lower()
+
+# Dokumen user lama menyimpan email apa adanya (tanpa normalisasi), jadi cari
+# bentuk asli dan bentuk ternormalisasinya
+def legacy_user_query(users_ref, email):
+    forms = list(dict.fromkeys([email, normalize_email(email)]))
+    return users_ref.where('email', 'in', forms).limit(1)
+
+@timed("user_lookup")
+def find_user(users_ref, email):
+    doc = users_ref.document(normalize_email(email)).get()
+    if doc.exists:
+        return doc
+    if Config.USERS_LEGACY_LOOKUP:
+        # User lama masih ber-id acak; lihat scripts/migrate_user_ids.py
+        snapshot = legacy_user_query(users_ref, email).get()
+        if snapshot:
+            return snapshot[0]
+    return None
+
+# Pesan error validasi data registrasi, None jika valid
+def registration_error(email, username, password):
+    if not email or not username or not password:
+        return "Email, username, dan password wajib diisi"
+    if not is_valid_email(email):
+        return "Format email tidak valid"
+    if not is_valid_password(password):
+        return "Password minimal 8 karakter, kombinasi huruf dan angka/simbol"
+    return None
+
+# Isi "result" response login; create_access_token butuh app context Flask
+def login_result(user_doc, user):
+    return {
+        "userId": user_doc.id,
+        "username": user['username'],
+        "token": create_access_token(identity=user['username'])
+    }
+
+def server_busy():
+    response = jsonify(error=True, message="Server sedang sibuk, coba lagi")
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     try:
@@ -78,22 +126,28 @@ def register():
         username = data.get('username')
         password = data.get('password')
 
-        if not email or not username or not password:
-            return jsonify(error=True, message="Email, username, dan password wajib diisi"), 400
-        if not is_valid_email(email):
-            return jsonify(error=True, message="Format email tidak valid"), 400
-        if not is_valid_password(password):
-            return jsonify(error=True, message="Password minimal 8 karakter, kombinasi huruf dan angka/simbol"), 400
+        error = registration_error(email, username, password)
+        if error:
+            return jsonify(error=True, message=error), 400
 
-        users_ref = db.collection('users')
-        existing_user = users_ref.where('email', '==', email).get()
-        if existing_user:
+        users_ref = get_firestore().collection('users')
+        with timed("user_lookup"):
+            legacy_user = Config.USERS_LEGACY_LOOKUP and legacy_user_query(users_ref, email).get()
+        if legacy_user:
             return jsonify(error=True, message="Email sudah terdaftar"), 400
 
-        hashed_pw = generate_password_hash(password)
-        users_ref.add({"username": username, "email": email, "password": hashed_pw})
+        with timed("password_hash"):
+            hashed_pw = password_hasher.hash(password)
+        try:
+            # create() gagal jika dokumen sudah ada, jadi email tetap unik tanpa transaksi
+            with timed("firestore_write"):
+                users_ref.document(normalize_email(email)).create({"username": username, "email": email, "password": hashed_pw})
+        except AlreadyExists:
+            return jsonify(error=True, message="Email sudah terdaftar"), 400
         return jsonify(error=False, message="Registrasi berhasil"), 201
 
+    except PasswordPoolBusy:
+        return server_busy()
     except Exception as e:
         print(f"[REGISTER ERROR] {e}")
         return jsonify(error=True, message="Terjadi kesalahan server"), 500
@@ -108,31 +162,33 @@ def login():
         if not email or not password:
             return jsonify(error=True, message="Email dan password wajib diisi"), 400
 
-        users_ref = db.collection('users')
-        snapshot = users_ref.where('email', '==', email).get()
-        if not snapshot:
+        user_doc = find_user(get_firestore().collection('users'), email)
+        if user_doc is None:
             return jsonify(error=True, message="Email atau password salah"), 401
 
-        user_doc = snapshot[0]
         user = user_doc.to_dict()
 
-        if not check_password_hash(user['password'], password):
+        with timed("password_verify"):
+            valid, new_hash = password_hasher.verify(user['password'], password)
+        if not valid:
             return jsonify(error=True, message="Email atau password salah"), 401
+        if new_hash is not None:
+            # Parameter hash sudah berubah: simpan hash baru selagi password diketahui
+            try:
+                user_doc.reference.update({"password": new_hash})
+            except Exception as e:
+                print(f"[LOGIN REHASH ERROR] {e}")
 
-        token = create_access_token(identity=user['username'])
-
-        return jsonify(error=False, message="Login berhasil", result={
-            "userId": user_doc.id,
-            "username": user['username'],
-            "token": token
-        }), 200
+        return jsonify(error=False, message="Login berhasil", result=login_result(user_doc, user)), 200
 
+    except PasswordPoolBusy:
+        return server_busy()
     except Exception as e:
         print(f"[LOGIN ERROR] {e}")
         return jsonify(error=True, message="Terjadi kesalahan server"), 500
 
 @auth_bp.route('/', methods=['GET'])
-@jwt_required()
+@jwt_required
 def protected():
     username = get_jwt_identity()
     return jsonify(message=f"Selamat datang, {username}"), 200
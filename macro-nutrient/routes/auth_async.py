@@ -0,0 +1,99 @@
+# Versi async /auth/login dan /auth/register untuk entrypoint ASGI (asgi.py).
+# Lookup dan tulis user lewat Firestore AsyncClient, hashing password tetap di
+# process pool (services/passwords.py) tanpa menahan event loop. Validasi,
+# query user lama dan isi response sama dengan routes/auth.py.
+from google.api_core.exceptions import AlreadyExists
+
+from config import Config
+from routes.auth import legacy_user_query, login_result, normalize_email, registration_error
+from services.asgi_support import json_payload
+from services.clients import get_async_firestore
+from services.metrics import timed
+from services.passwords import PasswordPoolBusy, password_hasher
+
+
+async def find_user(users_ref, email):
+    with timed("user_lookup"):
+        doc = await users_ref.document(normalize_email(email)).get()
+        if doc.exists:
+            return doc
+        if Config.USERS_LEGACY_LOOKUP:
+            # User lama masih ber-id acak; lihat scripts/migrate_user_ids.py
+            snapshot = await legacy_user_query(users_ref, email).get()
+            if snapshot:
+                return snapshot[0]
+    return None
+
+
+def server_busy():
+    return json_payload(dict(error=True, message="Server sedang sibuk, coba lagi"), 503, {"Retry-After": "1"})
+
+
+async def register(request):
+    try:
+        data = await request.json()
+        email = data.get('email')
+        username = data.get('username')
+        password = data.get('password')
+
+        error = registration_error(email, username, password)
+        if error:
+            return json_payload(dict(error=True, message=error), 400)
+
+        users_ref = get_async_firestore().collection('users')
+        with timed("user_lookup"):
+            legacy_user = Config.USERS_LEGACY_LOOKUP and await legacy_user_query(users_ref, email).get()
+        if legacy_user:
+            return json_payload(dict(error=True, message="Email sudah terdaftar"), 400)
+
+        with timed("password_hash"):
+            hashed_pw = await password_hasher.hash_async(password)
+        try:
+            # create() gagal jika dokumen sudah ada, jadi email tetap unik tanpa transaksi
+            with timed("firestore_write"):
+                await users_ref.document(normalize_email(email)).create(
+                    {"username": username, "email": email, "password": hashed_pw})
+        except AlreadyExists:
+            return json_payload(dict(error=True, message="Email sudah terdaftar"), 400)
+        return json_payload(dict(error=False, message="Registrasi berhasil"), 201)
+
+    except PasswordPoolBusy:
+        return server_busy()
+    except Exception as e:
+        print(f"[REGISTER ERROR] {e}")
+        return json_payload(dict(error=True, message="Terjadi kesalahan server"), 500)
+
+
+async def login(request):
+    try:
+        data = await request.json()
+        email = data.get('email')
+        password = data.get('password')
+
+        if not email or not password:
+            return json_payload(dict(error=True, message="Email dan password wajib diisi"), 400)
+
+        user_doc = await find_user(get_async_firestore().collection('users'), email)
+        if user_doc is None:
+            return json_payload(dict(error=True, message="Email atau password salah"), 401)
+
+        user = user_doc.to_dict()
+
+        with timed("password_verify"):
+            valid, new_hash = await password_hasher.verify_async(user['password'], password)
+        if not valid:
+            return json_payload(dict(error=True, message="Email atau password salah"), 401)
+        if new_hash is not None:
+            # Parameter hash sudah berubah: simpan hash baru selagi password diketahui
+            try:
+                await user_doc.reference.update({"password": new_hash})
+            except Exception as e:
+                print(f"[LOGIN REHASH ERROR] {e}")
+
+        return json_payload(dict(error=False, message="Login berhasil", result=login_result(user_doc, user)))
+
+    except PasswordPoolBusy:
+        return server_busy()
+    except Exception as e:
+        print(f"[LOGIN ERROR] {e}")
+        return json_payload(dict(error=True, message="Terjadi kesalahan server"), 500)
@@ -1,19 +1,31 @@
+import atexit
+import base64
+import itertools
+import json
 import os
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 import numpy as np
-import io
-from PIL import Image
 import uuid
-from services.store_data import store_data, initialize_firestore
-from tensorflow.keras.preprocessing.image import img_to_array
-from google.cloud import firestore, storage
-import json
-import jwt
-from datetime import datetime
-
-# Inisialisasi GCS client
-gcs_client = storage.Client()
-bucket = gcs_client.bucket("mymlbucket017")
+from concurrent.futures import ThreadPoolExecutor
+from services.store_data import store_data_batch, initialize_firestore
+from services.prediction_mirror import prediction_mirror
+from services.aggregates import daily_increments, get_summary, parse_day, today
+from services.preprocess import preprocess_image, TARGET_SIZE
+from services.nutrition_index import NutritionIndex
+from services.postprocess import Postprocessor
+from services.persistence import PersistenceQueue
+from services.prediction_cache import PredictionCache, SQLiteCacheBackend, image_digest
+from config import Config
+from google.cloud import firestore
+from services.auth_tokens import identity_from_request, token_cache
+from services.metrics import Counter, ops_endpoint, timed
+from services.admission import AdmissionController, admission_controlled, register_gauges
+from services.food_gate import build_food_gate
+from services.response_cache import CachedResponse, ResponseCache, json_response, strong_etag
+from services.image_derivative import derivative_object_name, encode_derivative
+from google.api_core.exceptions import AlreadyExists, PreconditionFailed
+from services.clients import get_bucket
+from datetime import datetime, timedelta, timezone
 
 # Blueprint untuk inference
 inference_bp = Blueprint('inference', __name__)
@@ -21,6 +33,64 @@ base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 json_path = os.path.join(base_dir, 'dataset', 'nutrition_fact.json')
 
 CLASS_NAMES = ["ayam_goreng", "burger", "donat", "kentang_goreng", "mie"]
+CONFIDENCE_THRESHOLD = 85
+NOT_FOOD_MESSAGE = "Gambar yang diinput bukan makanan. Mohon input gambar kembali."
+# Field yang ditampilkan list history (projection Firestore); user_id dan
+# updated_at tidak dirender sehingga tidak ikut dibaca
+HISTORY_FIELDS = ["label", "confidence", "created_at", "facts", "image"]
+
+# Fakta nutrisi dimuat sekali dan diindeks sesuai urutan CLASS_NAMES
+nutrition_index = NutritionIndex(json_path, CLASS_NAMES)
+# Top-k, threshold dan facts untuk seluruh batch output model sekaligus
+postprocess = Postprocessor(
+    CLASS_NAMES, nutrition_index, CONFIDENCE_THRESHOLD,
+    max_k=Config.TOP_K_MAX, from_logits=Config.MODEL_OUTPUT_LOGITS,
+)
+
+# Cache hasil prediksi per SHA-256 gambar (opsional dibagi antar worker lewat SQLite)
+prediction_cache = None
+if Config.PREDICTION_CACHE_SIZE > 0:
+    prediction_cache = PredictionCache(
+        max_entries=Config.PREDICTION_CACHE_SIZE,
+        shared=SQLiteCacheBackend(Config.PREDICTION_CACHE_PATH) if Config.PREDICTION_CACHE_PATH else None,
+    )
+
+# Cache response baca (dokumen prediksi dan halaman history) beserta ETag-nya
+read_cache = None
+if Config.READ_CACHE_SIZE > 0:
+    read_cache = ResponseCache(max_entries=Config.READ_CACHE_SIZE, ttl=Config.READ_CACHE_TTL)
+
+# Gate murah "jelas bukan makanan" sebelum model utama (opsional, FOOD_GATE);
+# model gate dimuat per worker saat pertama dipakai, bukan di master gunicorn
+food_gate = build_food_gate(Config)
+
+# Admission control untuk route inference (per worker)
+admission = None
+if Config.ADMISSION_MAX_CONCURRENT > 0:
+    admission = AdmissionController(
+        max_concurrent=Config.ADMISSION_MAX_CONCURRENT,
+        max_queue=Config.ADMISSION_MAX_QUEUE,
+        queue_timeout=Config.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+    )
+    register_gauges(admission)
+
+IMAGE_UPLOADS = Counter("macro_image_uploads_total", "Upload gambar history ke GCS.", ("result",))
+IMAGE_UPLOAD_BYTES = Counter("macro_image_upload_bytes_total", "Total bytes gambar history yang diupload ke GCS.")
+# Objek dinamai hash isinya sehingga tidak pernah berubah
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Executor untuk upload gambar secara paralel
+upload_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gcs-upload")
+
+# Antrean write-behind: upload GCS dan tulis Firestore setelah response dikirim
+persistence_queue = None
+if Config.PERSISTENCE_ASYNC:
+    persistence_queue = PersistenceQueue(
+        workers=Config.PERSISTENCE_WORKERS,
+        max_size=Config.PERSISTENCE_QUEUE_SIZE,
+        max_retries=Config.PERSISTENCE_MAX_RETRIES,
+    )
+    atexit.register(persistence_queue.drain, Config.PERSISTENCE_DRAIN_TIMEOUT)
 
 def format_timestamp(ts):
     """
@@ -42,52 +112,225 @@ def format_timestamp(ts):
     except Exception:
         return None
 
-# Fungsi untuk memproses gambar
-def preprocess_image(image_bytes, target_size=(224, 224)):
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    img = img.resize(target_size)
-    arr = img_to_array(img).astype("float32") / 255.0
-    return np.expand_dims(arr, axis=0)
-
-# Upload gambar ke GCS
-def upload_image_to_gcs(file, folder_name="images"):
-    try:
-        folder = f"{folder_name}/"
-        filename = f"{folder}{uuid.uuid4()}_{file.filename}"
-        blob = bucket.blob(filename)
-        file.seek(0)
-        blob.upload_from_file(file, content_type=file.content_type)
-        blob.make_public()
-        return filename, blob.public_url
-    except Exception as e:
-        current_app.logger.error(f"[GCS ERROR] Gagal mengupload gambar ke GCS: {e}")
-        return None, None
-
-# Fungsi decode JWT sesuai permintaan
-def decode_jwt(token):
+# Model siap jika salah satu backend (Keras / TFLite) berhasil dimuat
+def model_available():
+    return current_app.config.get('SERVING_FN') is not None or current_app.config.get('KERAS_MODEL') is not None
+
+# Jalankan model lewat batcher (jika aktif) agar request bersamaan digabung
+@timed("inference")
+def run_model(x):
+    batcher = current_app.config.get('INFERENCE_BATCHER')
+    if batcher is not None:
+        return batcher.submit(x)
+    serving_fn = current_app.config.get('SERVING_FN')
+    if serving_fn is not None:
+        return serving_fn(x)
+    return current_app.config['KERAS_MODEL'].predict(x, verbose=0)
+
+# Nama objek GCS = SHA-256 gambar upload, ditentukan di awal sehingga URL bisa
+# langsung dikembalikan dan gambar yang sama hanya disimpan sekali. ``digest``
+# dari classify_images dipakai ulang; hash dihitung di sini hanya jika cache nonaktif
+def image_object_name(image_bytes, digest=None):
+    return derivative_object_name(digest or image_digest(image_bytes), Config.IMAGE_DERIVATIVE_FORMAT)
+
+# URL publik dari IMAGE_PUBLIC_BASE_URL (mis. CDN) atau URL GCS; akses publik
+# diatur di level bucket, bukan ACL per objek
+def image_public_url(object_name):
+    if Config.IMAGE_PUBLIC_BASE_URL:
+        return f"{Config.IMAGE_PUBLIC_BASE_URL.rstrip('/')}/{object_name}"
+    return get_bucket().blob(object_name).public_url
+
+# Upload versi kecil gambar ke GCS. if_generation_match=0 membuat upload hanya
+# berhasil jika objek belum ada (tanpa request exists() terpisah); jika sudah
+# ada, gambar yang sama pernah disimpan dan upload dilewati
+def upload_image_to_gcs(object_name, image_bytes):
+    data, content_type = encode_derivative(
+        image_bytes,
+        max_side=Config.IMAGE_DERIVATIVE_MAX_SIDE,
+        fmt=Config.IMAGE_DERIVATIVE_FORMAT,
+        quality=Config.IMAGE_DERIVATIVE_QUALITY,
+    )
+    blob = get_bucket().blob(object_name)
+    blob.cache_control = IMAGE_CACHE_CONTROL
     try:
-        options = {"verify_exp": False}
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'], options=options)
-        return payload
-    except jwt.InvalidTokenError as e:
-        current_app.logger.warning(f"Token invalid: {e}")
-        return None
-
-# Fungsi ambil user id dari header Authorization pakai decode_jwt
+        with timed("gcs_upload"):
+            blob.upload_from_string(data, content_type=content_type, if_generation_match=0)
+    except PreconditionFailed:
+        IMAGE_UPLOADS.inc(result="exists")
+        return False
+    IMAGE_UPLOADS.inc(result="uploaded")
+    IMAGE_UPLOAD_BYTES.inc(len(data))
+    return True
+
+# User id dari header Authorization; token lama tanpa verifikasi exp tetap diterima
 def get_user_id_from_token():
-    auth_header = request.headers.get('Authorization', '')
-    if auth_header.startswith('Bearer '):
-        token = auth_header.split(' ')[1]
-        payload = decode_jwt(token)
-        if payload and 'sub' in payload:
-            return payload['sub']
-    return None
+    return identity_from_request(verify_exp=False)
+
+# Dokumen Firestore untuk satu prediksi
+def build_prediction_doc(user_id, label, confidence_percent, nutrition_info, filename, url, now):
+    return {
+        "user_id": user_id,
+        "label": label,
+        "confidence": confidence_percent,
+        "created_at": now,
+        "updated_at": now,
+        "facts": nutrition_info,
+        "image": {
+            "filename": filename,
+            "public_url": url
+        }
+    }
+
+# Parameter ?top_k= (jumlah kandidat pada response), None jika tidak diminta
+def parse_top_k():
+    value = request.args.get('top_k')
+    if value is None:
+        return None
+    top_k = int(value)
+    if not 1 <= top_k <= postprocess.max_k:
+        raise ValueError
+    return top_k
+
+# Kandidat top-k pada response (juga saat gambar ditolak karena di bawah threshold)
+def format_candidates(candidates):
+    return [{"label": label, "confidence": f"{confidence}%"} for label, confidence in candidates]
+
+# Bentuk "result" pada response predict
+def build_result(label, confidence_percent, nutrition_info, user_id, doc_id=None, filename=None, url=None, now=None,
+                 candidates=None):
+    response_result = {
+        "label": label,
+        "confidence": f"{confidence_percent}%",
+        "facts": nutrition_info,
+        "user_id": user_id
+    }
+    if candidates is not None:
+        response_result["top_k"] = format_candidates(candidates)
+
+    if user_id is not None:
+        now_str = format_timestamp(now or datetime.now(timezone.utc))
+        response_result.update({
+            "id": doc_id,
+            "filename": filename,
+            "public_url": url,
+            "created_at": now_str,
+            "updated_at": now_str,
+        })
+    return response_result
+
+# Klasifikasi gambar; gambar yang pernah diprediksi diambil dari cache
+# sehingga preprocessing dan model dilewati. Hasil berupa (prediksi, digest);
+# digest SHA-256 per gambar bernilai None jika prediction cache nonaktif
+def classify_images(images, top_k=None):
+    results = [None] * len(images)
+    keys = [None] * len(images)
+    # Posisi miss dikelompokkan per digest: gambar yang sama dalam satu request
+    # cukup diproses sekali (tanpa cache tidak ada digest, setiap posisi sendiri)
+    groups = {}
+    for i, image_bytes in enumerate(images):
+        if prediction_cache is not None:
+            keys[i] = image_digest(image_bytes)
+            if keys[i] in groups:
+                groups[keys[i]].append(i)
+                continue
+            results[i] = prediction_cache.get(keys[i])
+        # Entri cache lama tanpa kandidat top-k, atau dengan kandidat lebih sedikit
+        # dari yang diminta (dihitung dengan TOP_K_MAX lama), dihitung ulang
+        if results[i] is None or len(results[i].get("candidates", ())) < (top_k or 1):
+            groups[i if keys[i] is None else keys[i]] = [i]
+
+    misses = list(groups.values())
+    if not misses:
+        return results, keys
+
+    if len(misses) == 1:
+        x = preprocess_image(images[misses[0][0]])
+    else:
+        # Satu gambar per kelompok ditulis langsung ke satu array batch
+        x = np.empty((len(misses), TARGET_SIZE[1], TARGET_SIZE[0], 3), dtype="float32")
+        for j, positions in enumerate(misses):
+            preprocess_image(images[positions[0]], out=x[j:j + 1])
+
+    if food_gate is not None:
+        # Gambar yang jelas bukan makanan tidak perlu forward pass model utama
+        with timed("food_gate"):
+            passed = food_gate.check(x)
+        if not passed.all():
+            for j in np.flatnonzero(~passed):
+                rejected = {"label": None, "confidence": 0.0, "facts": None, "candidates": []}
+                for i in misses[j]:
+                    results[i] = rejected
+            misses = [positions for positions, ok in zip(misses, passed) if ok]
+            if not misses:
+                return results, keys
+            x = x[passed]
+
+    preds = run_model(x)
+    with timed("postprocess"):
+        predictions = postprocess(preds)
+
+    for positions, prediction in zip(misses, predictions):
+        for i in positions:
+            results[i] = prediction
+        if prediction_cache is not None:
+            prediction_cache.set(keys[positions[0]], prediction)
+    return results, keys
+
+# Upload gambar (paralel) lalu tulis dokumen prediksi. Dijalankan di antrean
+# persistence dan aman diulang: gambar yang sudah terupload dicatat di `uploaded`
+def persist_predictions(uploads, docs, uploaded):
+    # Gambar yang sama dalam satu batch cukup diupload sekali
+    pending = {object_name: image_bytes for object_name, image_bytes in uploads if object_name not in uploaded}
+    futures = {
+        upload_executor.submit(upload_image_to_gcs, object_name, image_bytes): object_name
+        for object_name, image_bytes in pending.items()
+    }
+    errors = []
+    for future, object_name in futures.items():
+        try:
+            future.result()
+            uploaded.add(object_name)
+        except Exception as e:
+            errors.append(e)
+    if errors:
+        raise errors[0]
+
+    # Dokumen prediksi dan increment total harian ditulis atomik dalam satu batch.
+    # AlreadyExists berarti percobaan sebelumnya sudah ter-commit di server
+    # (mis. DeadlineExceeded di client), jadi batch ini tidak ditulis ulang
+    try:
+        store_data_batch("predictions", docs, merges=daily_increments(docs, nutrition_index.nutrients))
+    except AlreadyExists:
+        print(f"Batch {len(docs)} prediksi sudah tersimpan sebelumnya, dilewati.")
+        if prediction_mirror is not None:
+            prediction_mirror.write_through(docs)
+
+    # History user yang bersangkutan berubah; dilakukan setelah tulis selesai
+    # agar request di antaranya tidak meng-cache history tanpa dokumen baru
+    if read_cache is not None:
+        for user_id in {doc["user_id"] for _, doc in docs}:
+            read_cache.invalidate_user(user_id)
+
+# Simpan di background; jika antrean penuh/nonaktif, simpan langsung di request
+def save_predictions(uploads, docs):
+    uploaded = set()
+    if persistence_queue is not None and persistence_queue.submit(persist_predictions, uploads, docs, uploaded):
+        return True
+    try:
+        persist_predictions(uploads, docs, uploaded)
+        return True
+    except Exception as e:
+        current_app.logger.error(f"[GCS ERROR] Gagal menyimpan gambar/prediksi: {e}")
+        return False
 
 # Endpoint predict
 @inference_bp.route('/predict', methods=['POST'])
+@admission_controlled(admission, lambda: current_app.config['MAX_UPLOAD_BYTES'])
 def predict():
-    keras_model = current_app.config.get('KERAS_MODEL')
-    if keras_model is None:
+    if not model_available():
+        model_ready = current_app.config.get('MODEL_READY')
+        if model_ready is not None and not model_ready.is_set():
+            return jsonify(error=True, message="Model sedang dimuat, coba lagi sebentar"), 503, {"Retry-After": "5"}
         return jsonify(error=True, message="Model belum tersedia"), 500
 
     if 'image' not in request.files:
@@ -98,84 +341,47 @@ def predict():
         return jsonify(error=True, message="Nama file kosong"), 400
 
     try:
-        x = preprocess_image(file.read())
-        preds = keras_model.predict(x)
-        idx = int(np.argmax(preds[0]))
-        label = CLASS_NAMES[idx]
+        top_k = parse_top_k()
+    except ValueError:
+        return jsonify(error=True, message=f"Parameter top_k harus 1-{postprocess.max_k}"), 400
 
-        confidence = float(preds[0][idx])
-        confidence_percent = round(confidence * 100, 2)  # jadi persen
-        confidence_with_percent = f"{confidence_percent}%"
-
-        # Threshold pengecekan confidence minimal 85%
-        if confidence_percent < 85:
-            return jsonify(error=True, message="Gambar yang diinput bukan makanan. Mohon input gambar kembali."), 400
+    try:
+        image_bytes = file.read()
+        predictions, digests = classify_images([image_bytes], top_k)
+        prediction = predictions[0]
+        label = prediction["label"]
+        confidence_percent = prediction["confidence"]
+        nutrition_info = prediction["facts"]
+
+        # Threshold pengecekan confidence minimal 85%; kandidat tetap dikirim jika diminta
+        if confidence_percent < CONFIDENCE_THRESHOLD:
+            if top_k:
+                return jsonify(error=True, message=NOT_FOOD_MESSAGE,
+                               top_k=format_candidates(prediction["candidates"][:top_k])), 400
+            return jsonify(error=True, message=NOT_FOOD_MESSAGE), 400
 
         doc_id = uuid.uuid4().hex
 
-        with open(json_path, 'r', encoding='utf-8') as f:
-            nutrition_data = json.load(f)
-
-        nutrition_info = next((item for item in nutrition_data if item.get('name') == label), None)
-        if nutrition_info:
-            nutrition_info = {
-                "name": nutrition_info.get("name").capitalize().replace('_', ' '),
-                "calories": str(nutrition_info.get("calories")) + ' kcal',
-                "protein": str(nutrition_info.get("protein")) + ' gram',
-                "carbohydrates": str(nutrition_info.get("carbohydrates")) + ' gram',
-                "fat": str(nutrition_info.get("fat")) + ' gram',
-                "gi": nutrition_info.get("gi"),  # glycemic index jika ada
-                "gl": nutrition_info.get("gl"),  # glycemic load jika ada
-            }
-
         user_id = get_user_id_from_token()
         login_status = user_id is not None
 
         filename = None
         url = None
+        now = datetime.now(timezone.utc)
 
         if login_status:
-            file.seek(0)
-            filename, url = upload_image_to_gcs(file)
-            if filename is None or url is None:
+            filename = image_object_name(image_bytes, digests[0])
+            url = image_public_url(filename)
+            doc = build_prediction_doc(user_id, label, confidence_percent, nutrition_info, filename, url, now)
+            if not save_predictions([(filename, image_bytes)], [(doc_id, doc)]):
                 return jsonify(error=True, message="Gagal mengupload gambar"), 500
-
-            now = firestore.SERVER_TIMESTAMP
-            store_data("predictions", doc_id, {
-                "user_id": user_id,
-                "label": label,
-                "confidence": confidence_percent,
-                "created_at": now,
-                "updated_at": now,
-                "facts": nutrition_info,
-                "image": {
-                    "filename": filename,
-                    "public_url": url
-                }
-            })
-            current_app.logger.info(f"Prediction stored for user {user_id}")
-
-        response_result = {
-            "label": label,
-            "confidence": confidence_with_percent,
-            "facts": nutrition_info,
-            "user_id": user_id
-        }
-
-        if login_status:
-            now_str = datetime.utcnow().strftime('%d/%m/%Y %H:%M:%S')
-            response_result.update({
-                "id": doc_id,
-                "filename": filename,
-                "public_url": url,
-                "created_at": now_str,
-                "updated_at": now_str,
-            })
+            current_app.logger.info(f"Prediction queued for user {user_id}")
 
         return jsonify(
             error=False,
             login=login_status,
-            result=response_result
+            result=build_result(label, confidence_percent, nutrition_info, user_id, doc_id, filename, url, now,
+                                candidates=prediction["candidates"][:top_k] if top_k else None)
         ), 200
 
     except Exception as e:
@@ -183,6 +389,197 @@ def predict():
         return jsonify(error=True, message="Gagal melakukan prediksi"), 500
 
 
+# Endpoint predict banyak gambar sekaligus (satu makanan = beberapa foto)
+@inference_bp.route('/predict/batch', methods=['POST'])
+@admission_controlled(admission, lambda: current_app.config['MAX_UPLOAD_BYTES'] * current_app.config['MAX_BATCH_IMAGES'])
+def predict_batch():
+    if not model_available():
+        model_ready = current_app.config.get('MODEL_READY')
+        if model_ready is not None and not model_ready.is_set():
+            return jsonify(error=True, message="Model sedang dimuat, coba lagi sebentar"), 503, {"Retry-After": "5"}
+        return jsonify(error=True, message="Model belum tersedia"), 500
+
+    files = request.files.getlist('image')
+    if not files:
+        return jsonify(error=True, message="Key 'image' tidak ditemukan"), 400
+    if any(file.filename == "" for file in files):
+        return jsonify(error=True, message="Nama file kosong"), 400
+
+    max_images = current_app.config['MAX_BATCH_IMAGES']
+    if len(files) > max_images:
+        return jsonify(error=True, message=f"Maksimal {max_images} gambar per request"), 400
+
+    try:
+        top_k = parse_top_k()
+    except ValueError:
+        return jsonify(error=True, message=f"Parameter top_k harus 1-{postprocess.max_k}"), 400
+
+    try:
+        images = [file.read() for file in files]
+        predictions, digests = classify_images(images, top_k)
+        user_id = get_user_id_from_token()
+        login_status = user_id is not None
+        now = datetime.now(timezone.utc)
+
+        results = []
+        uploads = []
+        docs = []
+        for image_bytes, digest, prediction in zip(images, digests, predictions):
+            if prediction["confidence"] < CONFIDENCE_THRESHOLD:
+                rejected = {"error": True, "message": NOT_FOOD_MESSAGE}
+                if top_k:
+                    rejected["top_k"] = format_candidates(prediction["candidates"][:top_k])
+                results.append(rejected)
+                continue
+
+            label, confidence_percent, nutrition_info = prediction["label"], prediction["confidence"], prediction["facts"]
+            doc_id = filename = url = None
+            if login_status:
+                doc_id = uuid.uuid4().hex
+                filename = image_object_name(image_bytes, digest)
+                url = image_public_url(filename)
+                uploads.append((filename, image_bytes))
+                docs.append((doc_id, build_prediction_doc(
+                    user_id, label, confidence_percent, nutrition_info, filename, url, now
+                )))
+            results.append({
+                "error": False,
+                "result": build_result(label, confidence_percent, nutrition_info, user_id, doc_id, filename, url, now,
+                                       candidates=prediction["candidates"][:top_k] if top_k else None),
+            })
+
+        if docs:
+            if not save_predictions(uploads, docs):
+                return jsonify(error=True, message="Gagal mengupload gambar"), 500
+            current_app.logger.info(f"{len(docs)} predictions queued for user {user_id}")
+
+        return jsonify(error=False, login=login_status, results=results), 200
+
+    except Exception as e:
+        current_app.logger.error(f"[PREDICT BATCH ERROR] {e}")
+        return jsonify(error=True, message="Gagal melakukan prediksi"), 500
+
+
+# Cursor history: base64 dari (created_at, doc id) dokumen terakhir di halaman
+def encode_cursor(created_at, doc_id):
+    raw = json.dumps({"t": created_at.isoformat(), "id": doc_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(raw["t"]), str(raw["id"])
+    except Exception:
+        raise ValueError("Cursor tidak valid")
+
+# Serialisasi payload sekali lalu simpan ke read cache (jika aktif) bersama ETag-nya
+def cache_json(key, payload, ttl=None):
+    body = current_app.json.dumps(payload).encode()
+    if read_cache is None:
+        return CachedResponse(body, strong_etag(body))
+    return read_cache.set(key, body, ttl)
+
+# Ubah data dokumen prediksi ke bentuk item history
+def format_history_doc(doc_id, d):
+    # Dokumen dari mirror SQLite berisi semua field; samakan dengan projection Firestore
+    d = {field: d[field] for field in HISTORY_FIELDS if field in d}
+    d['id'] = doc_id
+
+    # Format created_at ke string format dd/mm/yyyy HH:MM:SS
+    d['created_at'] = format_timestamp(d.get('created_at'))
+
+    if 'image' in d and isinstance(d['image'], dict):
+        d['public_url'] = d['image'].get('public_url')
+        d['filename'] = d['image'].get('filename')
+    return d
+
+# Iterasi satu halaman history sebagai (item, None). Jika masih ada dokumen
+# setelah halaman ini, elemen terakhir berupa (None, cursor halaman berikutnya).
+def iter_history_page(docs, limit):
+    last = None
+    for count, doc in enumerate(docs):
+        if count == limit:
+            if last is not None and last[0] is not None:
+                yield None, encode_cursor(*last)
+            return
+        d = doc.to_dict()
+        last = (d.get('created_at'), doc.id)
+        yield format_history_doc(doc.id, d), None
+
+# Query satu halaman history (limit + 1 dokumen untuk mendeteksi halaman berikutnya).
+# ``db`` bisa Client maupun AsyncClient (routes/inference_async.py); API query-nya sama
+def history_query(user_id, limit, after=None, db=None):
+    db = db or initialize_firestore()
+    query = db.collection('predictions')\
+        .where('user_id', '==', user_id)\
+        .order_by('created_at', direction=firestore.Query.DESCENDING)\
+        .order_by('__name__', direction=firestore.Query.DESCENDING)\
+        .select(HISTORY_FIELDS)
+    if after is not None:
+        created_at, doc_id = after
+        query = query.start_after({'created_at': created_at, '__name__': doc_id})
+    return query.limit(limit + 1)
+
+# Dokumen satu halaman history (limit + 1) dari mirror SQLite, None jika user belum di-sync
+def mirror_history_docs(user_id, limit, after):
+    if prediction_mirror is not None and prediction_mirror.is_warm(user_id):
+        return prediction_mirror.history(user_id, limit + 1, after)
+    return None
+
+# Dokumen satu halaman history: dari mirror jika user sudah di-sync, selain itu Firestore
+def fetch_history_docs(user_id, limit, after):
+    docs = mirror_history_docs(user_id, limit, after)
+    return docs if docs is not None else history_query(user_id, limit, after).stream()
+
+# Response history (tanpa stream) dari dokumen satu halaman
+def history_page(docs, limit):
+    history = []
+    next_cursor = None
+    for item, cursor in iter_history_page(docs, limit):
+        if item is None:
+            next_cursor = cursor
+        else:
+            history.append(item)
+    return dict(error=False, login=True, history=history, next_cursor=next_cursor)
+
+# Parameter limit dan after history; ValueError berisi pesan untuk response 400
+def parse_history_args(args):
+    try:
+        limit = int(args.get('limit', current_app.config['HISTORY_PAGE_SIZE']))
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        raise ValueError('Parameter limit tidak valid')
+    limit = min(limit, current_app.config['HISTORY_MAX_PAGE_SIZE'])
+    after = args.get('after')
+    return limit, decode_cursor(after) if after else None
+
+# ?stream=1: array history dikirim bertahap (hanya di route Flask)
+def stream_requested(args):
+    return args.get('stream', '').lower() in ('1', 'true')
+
+# Kunci read cache satu halaman history. Versi history user diambil sebelum
+# query: jika ada prediksi baru tersimpan selama query berjalan, hasil query
+# tersimpan di kunci yang sudah usang
+def history_cache_key(user_id, limit, after):
+    return ("history", user_id, read_cache.version(user_id), limit, after)
+
+# Stream array history per item, cursor halaman berikutnya ditulis di akhir
+def stream_history(docs, limit):
+    yield '{"error":false,"login":true,"history":['
+    next_cursor = None
+    count = 0
+    try:
+        for item, cursor in iter_history_page(docs, limit):
+            if item is None:
+                next_cursor = cursor
+                break
+            yield ("," if count else "") + current_app.json.dumps(item)
+            count += 1
+    except Exception as e:
+        current_app.logger.error(f"Firestore stream error: {e}")
+    yield '],"next_cursor":' + json.dumps(next_cursor) + '}'
+
 @inference_bp.route('/history', methods=['GET'])
 def get_history():
     user_id = get_user_id_from_token()
@@ -190,53 +587,103 @@ def get_history():
         return jsonify(error=False, login=False, history=[]), 200
 
     try:
-        db = initialize_firestore()
-        docs = db.collection('predictions')\
-            .where('user_id', '==', user_id)\
-            .order_by('created_at', direction=firestore.Query.DESCENDING)\
-            .stream()
+        limit, after = parse_history_args(request.args)
+    except ValueError as e:
+        return jsonify(error=True, login=True, message=str(e)), 400
+
+    stream = stream_requested(request.args)
+    cache_key = None
+    if read_cache is not None and not stream:
+        cache_key = history_cache_key(user_id, limit, request.args.get('after'))
+        entry = read_cache.get(cache_key)
+        if entry is not None:
+            return json_response(entry)
 
-        history = []
-        for doc in docs:
-            d = doc.to_dict()
-            d['id'] = doc.id
+    try:
+        if stream:
+            docs = iter(fetch_history_docs(user_id, limit, after))
+            # Ambil dokumen pertama dulu agar error query masih bisa jadi response 500
+            first = next(docs, None)
+            docs = itertools.chain([first] if first is not None else [], docs)
+            return Response(stream_with_context(stream_history(docs, limit)), mimetype='application/json')
 
-            # Format created_at dan updated_at ke string format dd/mm/yyyy HH:MM:SS
-            d['created_at'] = format_timestamp(d.get('created_at'))
-            d['updated_at'] = format_timestamp(d.get('updated_at'))
+        docs = fetch_history_docs(user_id, limit, after)
+        return json_response(cache_json(cache_key, history_page(docs, limit)))
 
-            if 'image' in d and isinstance(d['image'], dict):
-                d['public_url'] = d['image'].get('public_url')
-                d['filename'] = d['image'].get('filename')
+    except Exception as e:
+        current_app.logger.error(f"Firestore query error: {e}")
+        return jsonify(error=True, login=True, message='Gagal mengambil riwayat'), 500
 
-            history.append(d)
 
-        return jsonify(error=False, login=True, history=history), 200
+# Total nutrisi harian/mingguan dari dokumen agregat (O(jumlah hari))
+@inference_bp.route('/summary', methods=['GET'])
+def get_nutrition_summary():
+    user_id = get_user_id_from_token()
+    if user_id is None:
+        return jsonify(error=True, login=False, message="Login diperlukan untuk melihat ringkasan"), 401
+
+    try:
+        end = parse_day(request.args.get('to'), today())
+        start = parse_day(request.args.get('from'), end - timedelta(days=6))
+    except ValueError:
+        return jsonify(error=True, login=True, message="Format tanggal harus YYYY-MM-DD"), 400
+    if start > end:
+        return jsonify(error=True, login=True, message="Parameter 'from' harus sebelum 'to'"), 400
+    if (end - start).days >= current_app.config['SUMMARY_MAX_DAYS']:
+        return jsonify(error=True, login=True, message=f"Rentang maksimal {current_app.config['SUMMARY_MAX_DAYS']} hari"), 400
 
+    try:
+        summary = get_summary(initialize_firestore(), user_id, start, end)
+        return jsonify(error=False, login=True, **{"from": start.isoformat(), "to": end.isoformat()}, **summary), 200
     except Exception as e:
-        current_app.logger.error(f"Firestore query error: {e}")
-        return jsonify(error=True, login=True, message='Gagal mengambil riwayat'), 500
+        current_app.logger.error(f"[SUMMARY ERROR] {e}")
+        return jsonify(error=True, login=True, message="Gagal mengambil ringkasan"), 500
 
 
-# Get prediction by ID
+# Get prediction by ID. Dokumen prediksi tidak berubah setelah dibuat, jadi
+# response-nya di-cache lebih lama (READ_CACHE_DOC_TTL)
 @inference_bp.route('/<prediction_id>', methods=['GET'])
 def get_prediction_by_id(prediction_id):
+    cache_key = ("prediction", prediction_id)
+    entry = read_cache.get(cache_key) if read_cache is not None else None
+    if entry is not None:
+        return json_response(entry)
+
     try:
         db = initialize_firestore()
         doc_ref = db.collection("predictions").document(prediction_id)
         doc = doc_ref.get()
 
+        # 404 tidak di-cache: dokumen bisa masih di antrean write-behind
         if not doc.exists:
             return jsonify(error=True, message="Data tidak ditemukan"), 404
 
         data = doc.to_dict()
         data['id'] = doc.id
-        return jsonify(error=False, result=data), 200
+        return json_response(cache_json(cache_key, dict(error=False, result=data), Config.READ_CACHE_DOC_TTL))
 
     except Exception as e:
         current_app.logger.error(f"[GET BY ID ERROR] {e}")
         return jsonify(error=True, message="Gagal mengambil data"), 500
 
+# Statistik cache, batcher, antrean persistence, token cache, admission control, food gate,
+# read cache dan prediction mirror
+@inference_bp.route('/stats', methods=['GET'])
+@ops_endpoint
+def get_stats():
+    batcher = current_app.config.get('INFERENCE_BATCHER')
+    return jsonify(
+        error=False,
+        prediction_cache=prediction_cache.stats() if prediction_cache is not None else None,
+        batcher=batcher.stats() if batcher is not None else None,
+        persistence=persistence_queue.stats() if persistence_queue is not None else None,
+        token_cache=token_cache.stats() if token_cache is not None else None,
+        admission=admission.stats() if admission is not None else None,
+        food_gate=food_gate.stats() if food_gate is not None else None,
+        read_cache=read_cache.stats() if read_cache is not None else None,
+        prediction_mirror=prediction_mirror.stats() if prediction_mirror is not None else None,
+    ), 200
+
 # Get available labels
 @inference_bp.route('/labels', methods=['GET'])
 def get_labels():
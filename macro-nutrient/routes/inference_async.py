@@ -0,0 +1,74 @@
+# Versi async route /inference yang hanya menunggu Firestore, untuk entrypoint
+# ASGI (asgi.py). Query memakai Firestore AsyncClient sehingga satu worker
+# menunggu banyak query sekaligus tanpa satu thread per request. Cursor, format
+# item, read cache/ETag dan mirror sama dengan route Flask di routes/inference.py.
+from flask import current_app
+from starlette.concurrency import run_in_threadpool
+
+from config import Config
+from routes import inference
+from services.asgi_support import cached_json, json_payload
+from services.auth_tokens import identity_from_request
+from services.clients import get_async_firestore
+
+
+def get_user_id(request):
+    return identity_from_request(verify_exp=False, auth_header=request.headers.get("authorization", ""))
+
+
+# GET /inference/history tanpa ?stream=1 (stream tetap dilayani Flask)
+async def get_history(request):
+    user_id = get_user_id(request)
+    if user_id is None:
+        return json_payload(dict(error=False, login=False, history=[]))
+
+    try:
+        limit, after = inference.parse_history_args(request.query_params)
+    except ValueError as e:
+        return json_payload(dict(error=True, login=True, message=str(e)), 400)
+
+    cache_key = None
+    if inference.read_cache is not None:
+        cache_key = inference.history_cache_key(user_id, limit, request.query_params.get('after'))
+        entry = inference.read_cache.get(cache_key)
+        if entry is not None:
+            return cached_json(request, entry)
+
+    try:
+        docs = None
+        if inference.prediction_mirror is not None:
+            # SQLite lokal tetap blocking; dijalankan di thread pool, bukan di event loop
+            docs = await run_in_threadpool(inference.mirror_history_docs, user_id, limit, after)
+        if docs is None:
+            query = inference.history_query(user_id, limit, after, db=get_async_firestore())
+            docs = [doc async for doc in query.stream()]
+        return cached_json(request, inference.cache_json(cache_key, inference.history_page(docs, limit)))
+
+    except Exception as e:
+        current_app.logger.error(f"Firestore query error: {e}")
+        return json_payload(dict(error=True, login=True, message='Gagal mengambil riwayat'), 500)
+
+
+# GET /inference/<prediction_id>
+async def get_prediction_by_id(request):
+    prediction_id = request.path_params["prediction_id"]
+    cache_key = ("prediction", prediction_id)
+    entry = inference.read_cache.get(cache_key) if inference.read_cache is not None else None
+    if entry is not None:
+        return cached_json(request, entry)
+
+    try:
+        doc = await get_async_firestore().collection("predictions").document(prediction_id).get()
+
+        # 404 tidak di-cache: dokumen bisa masih di antrean write-behind
+        if not doc.exists:
+            return json_payload(dict(error=True, message="Data tidak ditemukan"), 404)
+
+        data = doc.to_dict()
+        data['id'] = doc.id
+        return cached_json(request, inference.cache_json(
+            cache_key, dict(error=False, result=data), Config.READ_CACHE_DOC_TTL))
+
+    except Exception as e:
+        current_app.logger.error(f"[GET BY ID ERROR] {e}")
+        return json_payload(dict(error=True, message="Gagal mengambil data"), 500)
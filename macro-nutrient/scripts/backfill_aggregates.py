@@ -0,0 +1,62 @@
+"""Backfill dokumen agregat harian (daily_nutrition) dari koleksi predictions.
+
+Semua prediksi dibaca ulang (hanya field user_id, label, created_at), dijumlah
+per (user, tanggal lokal) memakai nilai nutrisi di dataset, lalu dokumen
+agregat ditulis ulang (overwrite, bukan increment) dalam batch 500 dokumen.
+Aman dijalankan berulang; jalankan saat traffic rendah karena prediksi yang
+masuk selama backfill bisa tertimpa hitungannya.
+
+Jalankan dari folder macro-nutrient:
+    python -m scripts.backfill_aggregates --dry-run
+    python -m scripts.backfill_aggregates --user johndoe
+"""
+import argparse
+
+from google.cloud import firestore
+
+from routes.inference import nutrition_index
+from services.aggregates import COLLECTION, daily_doc_id, sum_by_day
+from services.clients import get_firestore
+
+BATCH_LIMIT = 500
+
+
+def iter_predictions(db, user_id=None):
+    query = db.collection("predictions")
+    if user_id:
+        query = query.where("user_id", "==", user_id)
+    for doc in query.select(["user_id", "label", "created_at"]).stream():
+        d = doc.to_dict()
+        yield d.get("user_id"), d.get("label"), d.get("created_at")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="Hanya backfill user_id ini")
+    parser.add_argument("--dry-run", action="store_true", help="Hitung tanpa menulis ke Firestore")
+    args = parser.parse_args()
+
+    db = get_firestore()
+    totals = sum_by_day(iter_predictions(db, args.user), nutrition_index.nutrients)
+    print(f"[INFO] {sum(t['count'] for t in totals.values())} prediksi -> {len(totals)} dokumen harian")
+    if args.dry_run:
+        return
+
+    batch = db.batch()
+    pending = 0
+    for (user_id, day), entry in totals.items():
+        data = {"user_id": user_id, "date": day.isoformat(), "updated_at": firestore.SERVER_TIMESTAMP}
+        data.update(entry)
+        batch.set(db.collection(COLLECTION).document(daily_doc_id(user_id, day)), data)
+        pending += 1
+        if pending == BATCH_LIMIT:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    print(f"[INFO] Backfill selesai: {len(totals)} dokumen ditulis ke {COLLECTION}.")
+
+
+if __name__ == "__main__":
+    main()
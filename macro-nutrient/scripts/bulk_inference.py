@@ -0,0 +1,254 @@
+"""Inference massal offline untuk folder gambar (atau mirror lokal bucket).
+
+Gambar dibaca lewat pipeline tf.data: baca file dan decode/resize (memakai
+preprocessing yang sama dengan endpoint predict) berjalan paralel, lalu
+di-batch besar dan di-prefetch sehingga model tidak menunggu I/O. Output
+model diolah per batch oleh post-processor yang sama dengan endpoint predict
+(label, confidence, threshold, fakta nutrisi, --top-k kandidat). Hasil ditulis
+sebagai JSONL, satu baris per gambar.
+
+Dengan --firestore, dokumen prediksi yang memakai gambar tersebut ikut
+diperbarui. Dokumen dicari lewat ``image.filename`` = nama objek GCS
+(``--prefix`` + path relatif terhadap folder, mis. ``images/<uuid>_<nama>``
+untuk upload lama atau ``images/<sha256>.webp``; satu objek bisa dipakai
+beberapa dokumen). Hanya hasil di atas threshold yang ditulis dan hanya
+dokumen yang labelnya berubah; selisih nutrisi label lama -> baru ditulis
+sebagai increment ke agregat harian (daily_nutrition) di batch yang sama.
+Cache response di server (READ_CACHE_*) dan mirror SQLite
+(PREDICTION_MIRROR_PATH) tidak ikut diperbarui: /inference/<id> bisa
+menampilkan label lama sampai READ_CACHE_DOC_TTL, dan history dari mirror
+sampai sync penuh berikutnya (scripts/sync_prediction_mirror.py tanpa
+--incremental).
+
+Jalankan dari folder macro-nutrient:
+    gsutil -m rsync -r gs://mymlbucket017/images /data/images
+    python -m scripts.bulk_inference /data/images --output relabel.jsonl --batch-size 128
+    python -m scripts.bulk_inference /data/images --output relabel.jsonl --firestore
+    python -m scripts.bulk_inference /data/images --output review.jsonl --top-k 3
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+from google.cloud import firestore
+
+from routes.inference import nutrition_index, postprocess
+from services.aggregates import COLLECTION as DAILY_COLLECTION, NUTRIENT_FIELDS, daily_doc_id, local_day
+from services.clients import get_firestore
+from services.model_loader import load_backend
+from services.preprocess import TARGET_SIZE, preprocess_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+FIRESTORE_BATCH_LIMIT = 500
+# Jumlah nilai maksimal untuk filter 'in' Firestore
+QUERY_IN_LIMIT = 30
+
+
+def list_images(folder):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(folder)
+        for name in names
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def _load_image(path):
+    # Dijalankan di thread tf.data; PIL melepas GIL saat decode/resize
+    out = np.empty((1, TARGET_SIZE[1], TARGET_SIZE[0], 3), dtype="float32")
+    try:
+        with open(path.decode("utf-8"), "rb") as f:
+            preprocess_image(f.read(), out=out)
+        return out[0], True
+    except Exception:
+        out.fill(0)
+        return out[0], False
+
+
+def build_dataset(paths, batch_size, parallelism):
+    def load(path):
+        image, ok = tf.numpy_function(_load_image, [path], (tf.float32, tf.bool))
+        image.set_shape((TARGET_SIZE[1], TARGET_SIZE[0], 3))
+        ok.set_shape(())
+        return path, image, ok
+
+    return (
+        tf.data.Dataset.from_tensor_slices(paths)
+        .map(load, num_parallel_calls=parallelism, deterministic=True)
+        .batch(batch_size)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+
+def object_name(path, root, prefix):
+    # Folder lokal adalah mirror bucket: <root>/<nama> <-> <prefix><nama>
+    return prefix + os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def build_record(path, prediction, top_k=None, object_name=None):
+    record = {
+        "path": path,
+        "object": object_name,
+        "label": prediction["label"],
+        "confidence": prediction["confidence"],
+        "facts": prediction["facts"],
+    }
+    if top_k:
+        record["top_k"] = [{"label": label, "confidence": confidence}
+                           for label, confidence in prediction["candidates"][:top_k]]
+    return record
+
+
+class FirestoreWriter:
+    """Perbarui dokumen prediksi (dan agregat hariannya) untuk gambar yang di-inference ulang.
+
+    Record dikumpulkan per ``QUERY_IN_LIMIT`` nama objek lalu dokumennya dicari
+    dengan satu query ``image.filename in [...]``. Update dan increment
+    agregat ditulis per batch (maks. 500 operasi per commit).
+    """
+
+    def __init__(self, collection, nutrients_for):
+        self.db = get_firestore()
+        self.collection = collection
+        self.nutrients_for = nutrients_for
+        self.pending = {}
+        self.updates = []
+        self.deltas = {}
+        self.written = 0
+        self.unchanged = 0
+        self.below_threshold = 0
+        self.not_found = 0
+
+    def add(self, record):
+        if record["facts"] is None:
+            # Di bawah threshold: dokumen yang sudah diterima tidak ditimpa
+            self.below_threshold += 1
+            return
+        self.pending[record["object"]] = record
+        if len(self.pending) == QUERY_IN_LIMIT:
+            self._resolve()
+
+    def _resolve(self):
+        records, self.pending = self.pending, {}
+        if not records:
+            return
+        query = self.db.collection(self.collection)\
+            .where("image.filename", "in", list(records))\
+            .select(["user_id", "label", "created_at", "image"])
+        found = set()
+        for doc in query.stream():
+            data = doc.to_dict()
+            record = records.get((data.get("image") or {}).get("filename"))
+            if record is None:
+                continue
+            found.add(record["object"])
+            if data.get("label") == record["label"]:
+                self.unchanged += 1
+                continue
+            self._stage(doc.reference, data, record)
+        self.not_found += len(records) - len(found)
+
+    def _stage(self, reference, data, record):
+        self.updates.append((reference, {
+            "label": record["label"],
+            "confidence": record["confidence"],
+            "facts": record["facts"],
+            "updated_at": firestore.SERVER_TIMESTAMP,
+        }))
+        # Agregat harian menghitung prediksi dengan label yang punya nilai nutrisi
+        if data.get("user_id") is not None and data.get("created_at") is not None:
+            old = self.nutrients_for(data.get("label"))
+            new = self.nutrients_for(record["label"])
+            key = (data["user_id"], local_day(data["created_at"]))
+            delta = self.deltas.setdefault(key, dict.fromkeys(("count",) + NUTRIENT_FIELDS, 0))
+            delta["count"] += (new is not None) - (old is not None)
+            for field in NUTRIENT_FIELDS:
+                delta[field] += ((new or {}).get(field) or 0) - ((old or {}).get(field) or 0)
+        if len(self.updates) + len(self.deltas) >= FIRESTORE_BATCH_LIMIT - 1:
+            self._commit()
+
+    def _commit(self):
+        if not self.updates:
+            return
+        batch = self.db.batch()
+        for reference, data in self.updates:
+            batch.update(reference, data)
+        for (user_id, day), delta in self.deltas.items():
+            data = {"user_id": user_id, "date": day.isoformat(), "updated_at": firestore.SERVER_TIMESTAMP}
+            data.update({field: firestore.Increment(value) for field, value in delta.items() if value})
+            batch.set(self.db.collection(DAILY_COLLECTION).document(daily_doc_id(user_id, day)), data, merge=True)
+        batch.commit()
+        self.written += len(self.updates)
+        self.updates = []
+        self.deltas = {}
+
+    def flush(self):
+        self._resolve()
+        self._commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", help="Folder gambar (dibaca rekursif)")
+    parser.add_argument("--output", default="bulk_inference.jsonl", help="File JSONL hasil")
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--parallelism", type=int, default=0, help="Thread decode paralel (0 = AUTOTUNE)")
+    parser.add_argument("--firestore", action="store_true", help="Update dokumen prediksi di Firestore")
+    parser.add_argument("--collection", default="predictions")
+    parser.add_argument("--prefix", default="images/",
+                        help="Prefix nama objek GCS untuk folder gambar (dipakai --firestore)")
+    parser.add_argument("--top-k", type=int, default=0,
+                        help=f"Sertakan k kandidat teratas di JSONL (maks. {postprocess.max_k})")
+    args = parser.parse_args()
+    if not 0 <= args.top_k <= postprocess.max_k:
+        parser.error(f"--top-k harus 0-{postprocess.max_k}")
+
+    paths = list_images(args.images)
+    if not paths:
+        raise SystemExit(f"Tidak ada gambar di {args.images}")
+    print(f"[INFO] {len(paths)} gambar ditemukan.")
+
+    keras_model, serving_fn = load_backend((args.batch_size,))
+    if serving_fn is None and keras_model is None:
+        raise SystemExit("Model gagal dimuat.")
+    predict = serving_fn or keras_model.predict_on_batch
+
+    writer = FirestoreWriter(args.collection, nutrition_index.nutrients) if args.firestore else None
+    dataset = build_dataset(paths, args.batch_size, args.parallelism or tf.data.AUTOTUNE)
+
+    done = failed = 0
+    start = time.perf_counter()
+    with open(args.output, "w", encoding="utf-8") as out:
+        for batch_paths, images, ok in dataset:
+            predictions = postprocess(predict(images))
+            ok = ok.numpy()
+            for j, raw_path in enumerate(batch_paths.numpy()):
+                path = raw_path.decode("utf-8")
+                if not ok[j]:
+                    out.write(json.dumps({"path": path, "error": "Gambar tidak bisa dibaca"}) + "\n")
+                    failed += 1
+                    continue
+                record = build_record(path, predictions[j], args.top_k, object_name(path, args.images, args.prefix))
+                out.write(json.dumps(record) + "\n")
+                if writer is not None:
+                    writer.add(record)
+            done += len(batch_paths)
+            elapsed = time.perf_counter() - start
+            print(f"\r[INFO] {done}/{len(paths)} gambar, {done / elapsed:.1f} gambar/detik", end="", flush=True)
+
+    if writer is not None:
+        writer.flush()
+    elapsed = time.perf_counter() - start
+    print(f"\n[INFO] Selesai: {done} gambar ({failed} gagal) dalam {elapsed:.1f} detik, "
+          f"{done / elapsed:.1f} gambar/detik -> {args.output}")
+    if writer is not None:
+        print(f"[INFO] {writer.written} dokumen diperbarui di koleksi {args.collection} "
+              f"({writer.unchanged} label sama, {writer.below_threshold} di bawah threshold, "
+              f"{writer.not_found} gambar tanpa dokumen).")
+
+
+if __name__ == "__main__":
+    main()
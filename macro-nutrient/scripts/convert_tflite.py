@@ -0,0 +1,47 @@
+"""Konversi SavedModel ke TFLite (float16 dan dynamic-range int8).
+
+Jalankan dari folder macro-nutrient:
+    python -m scripts.convert_tflite
+    python -m scripts.convert_tflite --saved-model ../local_models/saved_model --output-dir model
+
+Hasil:
+    model/model_float16.tflite  -> bobot float16, aktivasi float32
+    model/model_int8.tflite     -> dynamic-range quantization (bobot int8)
+Pilih backend saat serving dengan INFERENCE_BACKEND=tflite dan TFLITE_MODEL_PATH.
+"""
+import argparse
+import os
+
+import tensorflow as tf
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SAVED_MODEL = os.path.join(os.path.dirname(BASE_DIR), "local_models", "saved_model")
+DEFAULT_OUTPUT_DIR = os.path.join(BASE_DIR, "model")
+
+
+def convert(saved_model_dir, variant):
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--saved-model", default=DEFAULT_SAVED_MODEL)
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--variants", default="float16,int8")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for variant in args.variants.split(","):
+        tflite_model = convert(args.saved_model, variant)
+        path = os.path.join(args.output_dir, f"model_{variant}.tflite")
+        with open(path, "wb") as f:
+            f.write(tflite_model)
+        print(f"[INFO] {variant}: {path} ({len(tflite_model) / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
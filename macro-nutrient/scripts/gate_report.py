@@ -0,0 +1,145 @@
+"""Laporan food gate: compute yang dihemat vs false rejection pada sampel berlabel.
+
+Struktur folder sampel:
+    <root>/not_food/...   gambar bukan makanan
+    <root>/<lainnya>/...  gambar makanan (mis. <root>/food/ atau per kelas)
+
+Setiap gambar di-preprocess sekali, lalu diberi skor oleh gate (heuristic
+atau model TFLite) dan, jika tersedia, diprediksi model utama. Untuk setiap
+threshold dilaporkan:
+  gated          : fraksi semua gambar yang ditolak gate (forward pass dihemat)
+  false_reject   : fraksi gambar makanan yang ikut ditolak gate
+  lost_accepts   : fraksi gambar yang sebenarnya lolos model utama (>= 85%)
+                   tetapi ditolak gate (dampak nyata ke user)
+  non_food_caught: fraksi gambar bukan makanan yang ditolak gate
+  saved_pct      : penghematan waktu inference dibanding tanpa gate
+
+Jalankan dari folder macro-nutrient:
+    python -m scripts.gate_report samples/ --gate heuristic --thresholds 0.02,0.05,0.1
+    python -m scripts.gate_report samples/ --gate model --model-path model/food_gate.tflite --output gate.json
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from config import Config
+from routes.inference import CONFIDENCE_THRESHOLD
+from services.food_gate import HeuristicGate, ModelGate
+from services.preprocess import TARGET_SIZE, preprocess_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+NOT_FOOD_DIRS = ("not_food", "non_food", "bukan_makanan")
+
+
+def list_samples(root):
+    samples = []
+    for folder, _, names in os.walk(root):
+        top = os.path.relpath(folder, root).split(os.sep)[0]
+        for name in sorted(names):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                samples.append((os.path.join(folder, name), top.lower() not in NOT_FOOD_DIRS))
+    return sorted(samples)
+
+
+def load_arrays(samples):
+    x = np.empty((len(samples), TARGET_SIZE[1], TARGET_SIZE[0], 3), dtype="float32")
+    keep = []
+    for i, (path, _) in enumerate(samples):
+        try:
+            with open(path, "rb") as f:
+                preprocess_image(f.read(), out=x[i:i + 1])
+            keep.append(i)
+        except Exception as e:
+            print(f"[WARN] Lewati {path}: {e}")
+    return x[keep], [samples[i] for i in keep]
+
+
+def main_model_accepts(x, batch_size):
+    """(mask lolos model utama, ms per gambar) atau (None, None) jika model tidak tersedia."""
+    from services.model_loader import load_backend
+
+    keras_model, serving_fn = load_backend((batch_size,))
+    predict = serving_fn or (keras_model.predict_on_batch if keras_model is not None else None)
+    if predict is None:
+        return None, None
+    confidences = []
+    start = time.perf_counter()
+    for i in range(0, len(x), batch_size):
+        confidences.append(np.asarray(predict(x[i:i + batch_size])).max(axis=1) * 100)
+    per_image_ms = (time.perf_counter() - start) * 1000 / len(x)
+    return np.concatenate(confidences) >= CONFIDENCE_THRESHOLD, per_image_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("samples", help="Folder sampel berlabel")
+    parser.add_argument("--gate", choices=("heuristic", "model"), default="heuristic")
+    parser.add_argument("--model-path", default=Config.FOOD_GATE_MODEL_PATH, help="Model TFLite untuk --gate model")
+    parser.add_argument("--thresholds", help="Daftar threshold dipisah koma (default: nilai dari config)")
+    parser.add_argument("--min-saturation", type=float, default=Config.FOOD_GATE_MIN_SATURATION)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--model-ms", type=float, help="Waktu model utama per gambar jika model tidak dimuat")
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    x, samples = load_arrays(list_samples(args.samples))
+    if not samples:
+        raise SystemExit(f"Tidak ada gambar di {args.samples}")
+    is_food = np.array([food for _, food in samples])
+    print(f"[INFO] {len(samples)} gambar: {int(is_food.sum())} makanan, {int((~is_food).sum())} bukan makanan.")
+
+    if args.gate == "model":
+        gate = ModelGate(args.model_path)
+    else:
+        gate = HeuristicGate(min_saturation=args.min_saturation)
+    default_threshold = Config.FOOD_GATE_THRESHOLD if args.gate == "model" else Config.FOOD_GATE_MIN_FOOD_FRACTION
+    thresholds = [float(t) for t in args.thresholds.split(",")] if args.thresholds else [default_threshold]
+
+    start = time.perf_counter()
+    scores = np.concatenate([gate.scores(x[i:i + args.batch_size]) for i in range(0, len(x), args.batch_size)])
+    gate_ms = (time.perf_counter() - start) * 1000 / len(x)
+
+    accepted, model_ms = main_model_accepts(x, args.batch_size)
+    model_ms = model_ms or args.model_ms
+    print(f"[INFO] Gate {gate_ms:.3f} ms/gambar, model utama "
+          f"{f'{model_ms:.2f} ms/gambar' if model_ms else 'tidak tersedia (pakai --model-ms)'}.")
+
+    def rate(mask, population):
+        return round(float((mask & population).sum() / population.sum()), 4) if population.any() else None
+
+    rows = []
+    for threshold in thresholds:
+        gated = scores < threshold
+        row = {
+            "threshold": threshold,
+            "gated": round(float(gated.mean()), 4),
+            "false_reject": rate(gated, is_food),
+            "lost_accepts": rate(gated, accepted) if accepted is not None else None,
+            "non_food_caught": rate(gated, ~is_food),
+            "saved_pct": None,
+        }
+        if model_ms:
+            # Tanpa gate: model untuk semua gambar. Dengan gate: gate semua + model untuk yang lolos
+            row["saved_pct"] = round((1 - (gate_ms + (1 - row["gated"]) * model_ms) / model_ms) * 100, 2)
+        rows.append(row)
+
+    def pct(value):
+        return "-" if value is None else f"{value:.1%}"
+
+    print(f"\n{'threshold':>10} {'gated':>7} {'false_reject':>13} {'lost_accepts':>13} {'non_food_caught':>16} {'saved_pct':>10}")
+    for r in rows:
+        saved = "-" if r["saved_pct"] is None else f"{r['saved_pct']:.1f}%"
+        print(f"{r['threshold']:>10.3f} {pct(r['gated']):>7} {pct(r['false_reject']):>13} "
+              f"{pct(r['lost_accepts']):>13} {pct(r['non_food_caught']):>16} {saved:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"gate": args.gate, "gate_ms": gate_ms, "model_ms": model_ms, "samples": len(samples),
+                       "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Pindahkan dokumen users lama (id acak) ke id = email yang dinormalisasi.
+
+Login/register sekarang mengambil user langsung dengan
+``users/<email lowercase>``. Dokumen lama disalin ke id baru (create, jadi
+tidak menimpa dokumen yang sudah ada) lalu dokumen lama dihapus. Setelah
+migrasi selesai, set USERS_LEGACY_LOOKUP=false agar query email tidak
+dijalankan lagi.
+
+Sebelum migrasi, lookup lama hanya menemukan email yang ditulis persis
+sama atau versi lowercase-nya (mis. "A@x.com" tidak cocok dengan
+"a@X.com"), jadi jalankan migrasi ini sebelum membuka registrasi.
+
+Jalankan dari folder macro-nutrient:
+    python -m scripts.migrate_user_ids --dry-run
+    python -m scripts.migrate_user_ids
+"""
+import argparse
+
+from google.api_core.exceptions import AlreadyExists
+
+from routes.auth import normalize_email
+from services.clients import get_firestore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Tampilkan rencana tanpa menulis ke Firestore")
+    args = parser.parse_args()
+
+    users_ref = get_firestore().collection("users")
+    moved = skipped = conflicts = 0
+    for doc in users_ref.stream():
+        data = doc.to_dict()
+        email = data.get("email")
+        if not email or doc.id == normalize_email(email):
+            skipped += 1
+            continue
+        target = normalize_email(email)
+        print(f"[INFO] {doc.id} -> {target}")
+        if args.dry_run:
+            moved += 1
+            continue
+        try:
+            users_ref.document(target).create(data)
+        except AlreadyExists:
+            # Email ganda di data lama: biarkan dokumen lama untuk dicek manual
+            print(f"[WARN] users/{target} sudah ada, {doc.id} tidak dipindahkan.")
+            conflicts += 1
+            continue
+        doc.reference.delete()
+        moved += 1
+    print(f"[INFO] Selesai: {moved} dipindahkan, {skipped} sudah sesuai, {conflicts} konflik.")
+
+
+if __name__ == "__main__":
+    main()
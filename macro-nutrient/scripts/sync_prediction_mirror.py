@@ -0,0 +1,73 @@
+"""Sync/backfill mirror SQLite prediksi (PREDICTION_MIRROR_PATH) dari Firestore.
+
+Dokumen koleksi predictions dibaca (semua, satu user, atau hanya yang dibuat
+sejak sync penuh terakhir) lalu di-upsert ke mirror per 500 dokumen. Setelah
+selesai, user (atau seluruh mirror untuk sync penuh) ditandai warm sehingga
+/inference/history membaca dari mirror. Waktu sync dicatat dari awal proses,
+jadi prediksi yang masuk selama sync tetap diambil oleh sync berikutnya.
+
+Jalankan dari folder macro-nutrient (dengan PREDICTION_MIRROR_PATH yang sama
+dengan server):
+    python -m scripts.sync_prediction_mirror
+    python -m scripts.sync_prediction_mirror --user johndoe
+    python -m scripts.sync_prediction_mirror --incremental   # mis. dari cron
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from services.clients import get_firestore
+from services.prediction_mirror import FULL_SYNC, prediction_mirror
+
+CHUNK = 500
+# Jarak aman untuk selisih jam antar instance saat sync incremental
+INCREMENTAL_OVERLAP = timedelta(minutes=5)
+
+
+def iter_predictions(db, user_id=None, since=None):
+    query = db.collection("predictions")
+    if user_id:
+        query = query.where("user_id", "==", user_id)
+    if since is not None:
+        query = query.where("created_at", ">=", since)
+    for doc in query.stream():
+        yield doc.id, doc.to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="Hanya sync user_id ini")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Hanya prediksi sejak sync penuh terakhir (butuh sync penuh sebelumnya)")
+    args = parser.parse_args()
+
+    if prediction_mirror is None:
+        raise SystemExit("PREDICTION_MIRROR_PATH belum diset")
+
+    since = None
+    if args.incremental:
+        last = max(filter(None, (prediction_mirror.last_synced(FULL_SYNC),
+                                 args.user and prediction_mirror.last_synced(args.user))), default=None)
+        if last is None:
+            raise SystemExit("Belum pernah sync penuh; jalankan tanpa --incremental dulu")
+        since = datetime.fromtimestamp(last, timezone.utc) - INCREMENTAL_OVERLAP
+
+    started = time.time()
+    total = 0
+    chunk = []
+    for doc in iter_predictions(get_firestore(), args.user, since):
+        chunk.append(doc)
+        if len(chunk) == CHUNK:
+            total += prediction_mirror.upsert(chunk)
+            chunk = []
+    if chunk:
+        total += prediction_mirror.upsert(chunk)
+
+    prediction_mirror.mark_synced(args.user or FULL_SYNC, started)
+    scope = f"user {args.user}" if args.user else "semua user"
+    print(f"[INFO] {total} prediksi ({scope}) disalin ke {prediction_mirror.path} "
+          f"dalam {time.time() - started:.1f} s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Cek paritas backend TFLite terhadap model Keras.
+
+Setiap backend dijalankan di proses terpisah agar angka RSS tidak saling
+tercampur. Dilaporkan: top-1 agreement dan selisih confidence terhadap Keras,
+latensi per gambar, serta RSS setelah model dimuat dan setelah inference.
+
+Jalankan dari folder macro-nutrient:
+    python -m scripts.tflite_parity --images path/ke/folder_gambar \\
+        --tflite model/model_float16.tflite model/model_int8.tflite
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from services.preprocess import preprocess_image
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def list_images(folder):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(folder)
+        for name in names
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def run_backend(backend, model_path, paths, queue):
+    """Dijalankan di proses anak: load model, prediksi semua gambar, kirim hasil."""
+    rss_start = rss_mb()
+    if backend == "keras":
+        import tensorflow as tf
+        from services.serving import ServingFunction
+
+        model = ServingFunction(tf.keras.models.load_model(model_path))
+    else:
+        from services.tflite_backend import TFLiteModel
+
+        model = TFLiteModel(model_path)
+    model.warmup()
+    rss_loaded = rss_mb()
+
+    preds = []
+    latencies = []
+    for path in paths:
+        with open(path, "rb") as f:
+            x = preprocess_image(f.read())
+        start = time.perf_counter()
+        preds.append(model(x)[0])
+        latencies.append(time.perf_counter() - start)
+
+    queue.put({
+        "preds": np.array(preds),
+        "latency_ms": np.array(latencies) * 1000,
+        "rss_loaded_mb": rss_loaded - rss_start,
+        "rss_total_mb": rss_mb(),
+    })
+
+
+def evaluate(backend, model_path, paths):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_backend, args=(backend, model_path, paths, queue))
+    proc.start()
+    while True:
+        try:
+            result = queue.get(timeout=1)
+            break
+        except Exception:
+            if not proc.is_alive():
+                raise SystemExit(f"Backend {backend} ({model_path}) gagal, exit code {proc.exitcode}")
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="Folder berisi gambar sampel")
+    parser.add_argument("--keras", default=os.path.join("model", "modelsl_saved_model.keras"))
+    parser.add_argument("--tflite", nargs="+", default=[
+        os.path.join("model", "model_float16.tflite"),
+        os.path.join("model", "model_int8.tflite"),
+    ])
+    args = parser.parse_args()
+
+    paths = list_images(args.images)
+    if not paths:
+        raise SystemExit(f"Tidak ada gambar di {args.images}")
+
+    reference = evaluate("keras", args.keras, paths)
+    ref_top1 = reference["preds"].argmax(axis=1)
+    ref_conf = reference["preds"].max(axis=1)
+    print(f"{len(paths)} gambar\n")
+    print(f"{'backend':<28} {'top1_agree':>10} {'dconf_mean':>10} {'dconf_max':>10} "
+          f"{'p50_ms':>8} {'p99_ms':>8} {'model_mb':>9} {'rss_mb':>8}")
+
+    rows = [("keras", reference)] + [(path, evaluate("tflite", path, paths)) for path in args.tflite]
+    for name, result in rows:
+        top1 = result["preds"].argmax(axis=1)
+        conf = result["preds"].max(axis=1)
+        dconf = np.abs(conf - ref_conf) * 100
+        print(f"{os.path.basename(name):<28} {np.mean(top1 == ref_top1) * 100:>9.1f}% "
+              f"{dconf.mean():>10.2f} {dconf.max():>10.2f} "
+              f"{np.percentile(result['latency_ms'], 50):>8.2f} {np.percentile(result['latency_ms'], 99):>8.2f} "
+              f"{result['rss_loaded_mb']:>9.1f} {result['rss_total_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
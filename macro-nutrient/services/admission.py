@@ -0,0 +1,115 @@
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+from services.metrics import Counter, Gauge
+
+SHED_TOTAL = Counter("macro_admission_shed_total", "Request inference yang ditolak admission control.", ("reason",))
+
+
+class AdmissionController:
+    """Batasi jumlah request inference yang diproses bersamaan.
+
+    Maksimal ``max_concurrent`` request berjalan; berikutnya menunggu di
+    antrean berukuran ``max_queue`` paling lama ``queue_timeout`` detik.
+    Jika antrean penuh atau waktu tunggu habis, ``acquire`` mengembalikan
+    alasan penolakan ("queue_full" / "queue_timeout") tanpa memproses
+    request, sehingga request ditolak cepat alih-alih menumpuk sampai timeout.
+    """
+
+    def __init__(self, max_concurrent=8, max_queue=8, queue_timeout=2.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "queue_timeout": 0, "too_large": 0}
+
+    def acquire(self):
+        """None jika request boleh jalan, atau alasan penolakan."""
+        with self._cond:
+            if self.active < self.max_concurrent and not self.waiting:
+                self.active += 1
+                self.admitted += 1
+                return None
+            if self.waiting >= self.max_queue:
+                return self._reject("queue_full")
+            self.waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return self._reject("queue_timeout")
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+            return None
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def _reject(self, reason):
+        self.shed[reason] += 1
+        SHED_TOTAL.inc(reason=reason)
+        return reason
+
+    def reject_too_large(self):
+        with self._cond:
+            return self._reject("too_large")
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "queue_timeout_ms": round(self.queue_timeout * 1000),
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+            }
+
+
+def admission_controlled(controller, max_bytes):
+    """Decorator route inference: tolak body terlalu besar lalu terapkan admission.
+
+    ``max_bytes`` (atau callable yang mengembalikannya) dibandingkan dengan
+    header Content-Length sebelum body dibaca. ``controller=None`` hanya
+    menjalankan pengecekan ukuran.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            limit = max_bytes() if callable(max_bytes) else max_bytes
+            if request.content_length is not None and request.content_length > limit:
+                if controller is not None:
+                    controller.reject_too_large()
+                else:
+                    SHED_TOTAL.inc(reason="too_large")
+                return jsonify(error=True, message=f"Ukuran upload maksimal {limit // (1024 * 1024)} MB"), 413
+
+            if controller is None:
+                return fn(*args, **kwargs)
+            if controller.acquire() is not None:
+                response = jsonify(error=True, message="Server sedang sibuk, coba lagi sebentar")
+                return response, 503, {"Retry-After": str(current_app.config["ADMISSION_RETRY_AFTER"])}
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                controller.release()
+        return wrapper
+    return decorator
+
+
+def register_gauges(controller):
+    Gauge("macro_admission_active", "Request inference yang sedang diproses.", lambda: controller.active)
+    Gauge("macro_admission_queue_depth", "Request inference yang menunggu giliran.", lambda: controller.waiting)
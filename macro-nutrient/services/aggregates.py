@@ -0,0 +1,91 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import quote
+
+from google.cloud import firestore
+
+from config import Config
+
+# Total nutrisi harian per user: satu dokumen per (user, tanggal lokal)
+COLLECTION = "daily_nutrition"
+NUTRIENT_FIELDS = ("calories", "protein", "carbohydrates", "fat")
+LOCAL_TZ = timezone(timedelta(hours=Config.SUMMARY_UTC_OFFSET_HOURS))
+
+
+def local_day(ts):
+    """Tanggal lokal (SUMMARY_UTC_OFFSET_HOURS) dari timestamp prediksi."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(LOCAL_TZ).date()
+
+
+def today():
+    return datetime.now(LOCAL_TZ).date()
+
+
+def daily_doc_id(user_id, day):
+    # user_id (username) di-quote agar "/" tidak dianggap path Firestore
+    return f"{quote(str(user_id), safe='')}_{day.isoformat()}"
+
+
+def sum_by_day(predictions, nutrients_for):
+    """Jumlahkan (user_id, label, created_at) menjadi total per (user_id, tanggal)."""
+    totals = defaultdict(lambda: dict.fromkeys(("count",) + NUTRIENT_FIELDS, 0))
+    for user_id, label, created_at in predictions:
+        nutrients = nutrients_for(label)
+        if nutrients is None or created_at is None:
+            continue
+        entry = totals[(user_id, local_day(created_at))]
+        entry["count"] += 1
+        for field in NUTRIENT_FIELDS:
+            entry[field] += nutrients.get(field) or 0
+    return totals
+
+
+def daily_increments(docs, nutrients_for):
+    """Update merge (collection, doc_id, data) yang menambah total harian.
+
+    ``docs`` berisi (doc_id, data) dokumen prediksi yang akan ditulis; hasilnya
+    ditulis di batch yang sama sehingga prediksi dan agregat selalu konsisten.
+    """
+    totals = sum_by_day(
+        ((data["user_id"], data["label"], data["created_at"]) for _, data in docs),
+        nutrients_for,
+    )
+    updates = []
+    for (user_id, day), entry in totals.items():
+        data = {"user_id": user_id, "date": day.isoformat(), "updated_at": firestore.SERVER_TIMESTAMP}
+        data.update({field: firestore.Increment(value) for field, value in entry.items()})
+        updates.append((COLLECTION, daily_doc_id(user_id, day), data))
+    return updates
+
+
+def parse_day(value, default):
+    return date.fromisoformat(value) if value else default
+
+
+def get_summary(db, user_id, start, end):
+    """Baca dokumen harian start..end (inklusif): O(jumlah hari), tanpa query index."""
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    refs = [db.collection(COLLECTION).document(daily_doc_id(user_id, day)) for day in days]
+    found = {snap.id: snap.to_dict() for snap in db.get_all(refs) if snap.exists}
+
+    daily = []
+    for day in days:
+        data = found.get(daily_doc_id(user_id, day)) or {}
+        entry = {"date": day.isoformat(), "count": data.get("count", 0)}
+        entry.update({field: round(data.get(field, 0), 2) for field in NUTRIENT_FIELDS})
+        daily.append(entry)
+
+    weekly = {}
+    for entry in daily:
+        year, week, _ = date.fromisoformat(entry["date"]).isocalendar()
+        key = f"{year}-W{week:02d}"
+        week_total = weekly.setdefault(key, dict({"week": key, "count": 0}, **dict.fromkeys(NUTRIENT_FIELDS, 0)))
+        week_total["count"] += entry["count"]
+        for field in NUTRIENT_FIELDS:
+            week_total[field] = round(week_total[field] + entry[field], 2)
+
+    total = {"count": sum(entry["count"] for entry in daily)}
+    total.update({field: round(sum(entry[field] for entry in daily), 2) for field in NUTRIENT_FIELDS})
+    return {"days": daily, "weeks": list(weekly.values()), "total": total}
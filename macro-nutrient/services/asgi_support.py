@@ -0,0 +1,47 @@
+import time
+from functools import wraps
+
+from flask import current_app
+from starlette.responses import Response
+from werkzeug.http import parse_etags
+
+from services.metrics import REQUEST_SECONDS
+from services.response_cache import etag_headers
+
+
+def json_payload(payload, status=200, headers=None):
+    """Response JSON dengan serializer Flask (format datetime dan urutan key sama)."""
+    return Response(current_app.json.dumps(payload), status, headers, media_type="application/json")
+
+
+def cached_json(request, entry):
+    """Padanan ``response_cache.json_response`` untuk handler ASGI."""
+    headers = etag_headers(entry)
+    if parse_etags(request.headers.get("if-none-match")).contains(entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, headers=headers, media_type="application/json")
+
+
+def asgi_view(flask_app, rule, handler):
+    """Bungkus handler async agar berperilaku seperti route Flask yang digantikannya.
+
+    Handler berjalan di app context ``flask_app`` (config, JWT, serializer JSON),
+    response diberi header CORS seperti flask-cors (origin dipantulkan, dengan
+    credentials) dan durasinya dicatat di ``macro_http_request_duration_seconds``
+    dengan label ``rule`` Flask yang sama. Server-Timing tidak dikirim.
+    """
+    @wraps(handler)
+    async def view(request):
+        start = time.perf_counter()
+        # Context Flask memakai contextvars, jadi aman melewati await di dalam task request
+        with flask_app.app_context():
+            response = await handler(request)
+        origin = request.headers.get("origin")
+        if origin:
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.headers.append("Vary", "Origin")
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=rule, method=request.method,
+                                status=response.status_code)
+        return response
+    return view
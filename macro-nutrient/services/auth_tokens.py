@@ -0,0 +1,155 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import jwt
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import decode_token as verify_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+
+from config import Config
+from services.metrics import timed
+
+
+class VerifiedTokenCache:
+    """Cache LRU+TTL token JWT yang signature-nya sudah diverifikasi.
+
+    Key adalah SHA-256 token (token mentah tidak disimpan), value adalah
+    payload hasil decode. ``exp`` tetap dicek di setiap hit, jadi token yang
+    sudah kedaluwarsa tidak pernah lolos hanya karena masih ada di cache.
+    """
+
+    def __init__(self, max_entries=4096, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.verifications = 0
+        self.verify_seconds = 0.0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, payload):
+        expires_at = time.time() + self.ttl
+        if payload.get("exp") is not None:
+            expires_at = min(expires_at, float(payload["exp"]))
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_verification(self, seconds):
+        with self._lock:
+            self.verifications += 1
+            self.verify_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "verifications": self.verifications,
+                "avg_verify_ms": round(self.verify_seconds * 1000 / self.verifications, 3) if self.verifications else None,
+            }
+
+
+token_cache = VerifiedTokenCache(Config.TOKEN_CACHE_SIZE, Config.TOKEN_CACHE_TTL) if Config.TOKEN_CACHE_SIZE > 0 else None
+
+
+def decode_token(token, verify_exp=True):
+    """Payload access token yang valid, atau None.
+
+    Verifikasi memakai ``flask_jwt_extended.decode_token`` (JWT_ALGORITHM,
+    JWT_DECODE_*, claim identity) dan hanya dilakukan sekali per token selama
+    masih di cache; ``type`` dan ``exp`` (jika ``verify_exp``) dicek di setiap
+    panggilan.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = token_cache.get(key) if token_cache is not None else None
+    if payload is None:
+        start = time.perf_counter()
+        try:
+            # exp dicek di bawah supaya payload yang sama bisa dipakai kedua mode
+            with timed("token_verify"):
+                payload = verify_token(token, allow_expired=True)
+        except (jwt.InvalidTokenError, JWTExtendedException) as e:
+            current_app.logger.warning(f"Token invalid: {e}")
+            return None
+        finally:
+            if token_cache is not None:
+                token_cache.record_verification(time.perf_counter() - start)
+        if token_cache is not None:
+            token_cache.set(key, payload)
+
+    # Refresh token tidak boleh dipakai sebagai access token
+    if payload.get("type", "access") != "access":
+        return None
+    leeway = current_app.config.get("JWT_DECODE_LEEWAY", 0)
+    if hasattr(leeway, "total_seconds"):
+        leeway = leeway.total_seconds()
+    if verify_exp and payload.get("exp") is not None and float(payload["exp"]) + leeway <= time.time():
+        return None
+    return payload
+
+
+def bearer_token(auth_header=None):
+    if auth_header is None:
+        auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        return auth_header.split(" ")[1]
+    return None
+
+
+def identity_from_request(verify_exp=True, auth_header=None):
+    """Identity (claim ``sub``) dari header Authorization, atau None.
+
+    Di luar request Flask (handler ASGI) header diberikan lewat ``auth_header``
+    dan pemanggil harus berada di app context.
+    """
+    token = bearer_token(auth_header)
+    if not token:
+        return None
+    payload = decode_token(token, verify_exp=verify_exp)
+    if payload and "sub" in payload:
+        return payload["sub"]
+    return None
+
+
+def jwt_required(fn):
+    """Pengganti ``flask_jwt_extended.jwt_required`` yang memakai token cache."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = bearer_token()
+        if not token:
+            return jsonify(msg="Missing Authorization Header"), 401
+        payload = decode_token(token)
+        if not payload or "sub" not in payload:
+            return jsonify(msg="Token tidak valid atau sudah kedaluwarsa"), 401
+        g.jwt_identity = payload["sub"]
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def get_jwt_identity():
+    return g.get("jwt_identity")
@@ -0,0 +1,121 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+_STOP = object()
+
+
+class BatchScheduler:
+    """Gabungkan tensor dari request yang berjalan bersamaan menjadi satu batch.
+
+    Setiap request memanggil ``submit(x)`` dengan array berbentuk (n, ...) dan
+    menunggu hasilnya. Thread scheduler mengumpulkan antrean sampai
+    ``max_batch_size`` baris terkumpul atau ``max_wait_ms`` habis, lalu
+    menjalankan ``predict_fn`` satu kali dan membagikan barisnya kembali.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0, name="inference-batcher"):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._carry = None
+        self.batches = 0
+        self.rows = 0
+
+    def _ensure_started(self):
+        # Thread tidak ikut ter-fork oleh gunicorn, jadi start per proses
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._carry = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, x, timeout=None):
+        """Kirim array (n, ...) dan tunggu hasil prediksi (n, num_classes)."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((np.asarray(x), future))
+        return future.result(timeout=timeout)
+
+    def close(self, timeout=None):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def _next_item(self, timeout=None):
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        return self._queue.get(timeout=timeout)
+
+    def _run(self):
+        while True:
+            item = self._next_item()
+            if item is _STOP:
+                return
+            pending = [item]
+            rows = len(item[0])
+            stop = False
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._next_item(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                if rows + len(item[0]) > self.max_batch_size:
+                    # Simpan untuk batch berikutnya agar ukuran batch tetap terbatas
+                    self._carry = item
+                    break
+                pending.append(item)
+                rows += len(item[0])
+            self._run_batch(pending, rows)
+            if stop:
+                return
+
+    def _run_batch(self, pending, rows):
+        if len(pending) == 1:
+            batch = pending[0][0]
+        else:
+            batch = np.concatenate([x for x, _ in pending], axis=0)
+        try:
+            preds = np.asarray(self.predict_fn(batch))
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += rows
+        offset = 0
+        for x, future in pending:
+            n = len(x)
+            future.set_result(preds[offset:offset + n])
+            offset += n
@@ -0,0 +1,81 @@
+import os
+import threading
+
+from config import Config
+
+# Registry client Google Cloud yang dipakai semua modul. Client dibuat saat
+# pertama kali dibutuhkan (bukan saat import) dan per proses, karena koneksi
+# gRPC tidak aman dibawa melewati fork worker gunicorn.
+_lock = threading.Lock()
+_clients = {}
+_overrides = {}
+
+
+def _get(name, factory):
+    if name in _overrides:
+        return _overrides[name]
+    key = (name, os.getpid())
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+    return client
+
+
+def _create_firestore():
+    from google.cloud import firestore
+
+    client = firestore.Client(project=Config.PROJECT_ID)
+    print("[INFO] Firestore client initialized.")
+    return client
+
+
+def _create_async_firestore():
+    from google.cloud import firestore
+
+    # Channel gRPC asyncio terikat ke event loop tempat client dibuat, jadi
+    # client ini hanya dipakai dari handler ASGI (loop worker uvicorn)
+    client = firestore.AsyncClient(project=Config.PROJECT_ID)
+    print("[INFO] Firestore AsyncClient initialized.")
+    return client
+
+
+def _create_storage():
+    from google.cloud import storage
+
+    client = storage.Client()
+    print("[INFO] GCS client initialized.")
+    return client
+
+
+def get_firestore():
+    return _get("firestore", _create_firestore)
+
+
+def get_async_firestore():
+    return _get("async_firestore", _create_async_firestore)
+
+
+def get_storage():
+    return _get("storage", _create_storage)
+
+
+def get_bucket(bucket_name=None):
+    bucket_name = bucket_name or Config.GCS_BUCKET_NAME
+    return _get(f"bucket:{bucket_name}", lambda: get_storage().bucket(bucket_name))
+
+
+def override(name, client):
+    """Ganti client (mis. "firestore", "async_firestore", "storage", "bucket:<nama>") dengan implementasi lain.
+
+    Dipakai untuk benchmark/emulator; ``client=None`` menghapus override.
+    """
+    with _lock:
+        if client is None:
+            _overrides.pop(name, None)
+        else:
+            _overrides[name] = client
@@ -0,0 +1,121 @@
+import os
+import threading
+from functools import partial
+
+import numpy as np
+
+
+def thumbnails(x, size):
+    """Ambil thumbnail (n, size, size, 3) dari batch float32 (n, h, w, 3) dengan sampling nearest."""
+    rows = np.arange(size) * x.shape[1] // size
+    cols = np.arange(size) * x.shape[2] // size
+    return x[:, rows][:, :, cols]
+
+
+class HeuristicGate:
+    """Gate "jelas bukan makanan" dari warna thumbnail, tanpa model.
+
+    Semua kelas (ayam goreng, burger, donat, kentang goreng, mie) didominasi
+    warna hangat: merah-kuning-coklat dengan saturasi cukup. Skor adalah
+    fraksi piksel berwarna hangat (hue 0-60 derajat, saturasi >=
+    ``min_saturation``, tidak terlalu gelap). Gambar dengan skor di bawah
+    ``min_food_fraction`` (mis. screenshot, dokumen, pemandangan biru/hijau)
+    ditolak sebelum model utama.
+    """
+
+    def __init__(self, min_food_fraction=0.05, min_saturation=0.15, min_value=0.12, size=56):
+        self.threshold = min_food_fraction
+        self.min_saturation = min_saturation
+        self.min_value = min_value
+        self.size = size
+
+    def scores(self, x):
+        thumb = thumbnails(x, self.size)
+        r, g, b = thumb[..., 0], thumb[..., 1], thumb[..., 2]
+        value = thumb.max(axis=-1)
+        saturation = (value - thumb.min(axis=-1)) / np.maximum(value, 1e-6)
+        warm = (r >= g) & (g >= b) & (saturation >= self.min_saturation) & (value >= self.min_value)
+        return warm.reshape(len(x), -1).mean(axis=1)
+
+
+class ModelGate:
+    """Gate berbasis model TFLite kecil (mis. biner food / non-food).
+
+    Input thumbnail mengikuti ukuran input model; output berupa probabilitas
+    "food" (kolom terakhir jika model mengeluarkan lebih dari satu kolom).
+    """
+
+    def __init__(self, model_path, threshold=0.2, num_threads=1):
+        from services.tflite_backend import TFLiteModel
+
+        self.threshold = threshold
+        self.model = TFLiteModel(model_path, num_threads=num_threads)
+        self.size = int(self.model.interpreter.get_input_details()[0]["shape"][1])
+
+    def scores(self, x):
+        preds = np.asarray(self.model(thumbnails(x, self.size)))
+        return preds.reshape(len(x), -1)[:, -1]
+
+
+class FoodGate:
+    """Tahap pertama cascade: tandai gambar yang jelas bukan makanan.
+
+    ``check(x)`` mengembalikan mask boolean (True = lanjut ke model utama).
+    Scorer dibuat dari ``scorer_factory`` saat pertama dipakai dan per proses:
+    interpreter TFLite tidak boleh dibuat di master gunicorn sebelum fork
+    (preload_app).
+    """
+
+    def __init__(self, scorer_factory, name):
+        self.scorer_factory = scorer_factory
+        self.name = name
+        self._scorer = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.rejected = 0
+
+    @property
+    def scorer(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._scorer = self.scorer_factory()
+                    self._pid = os.getpid()
+        return self._scorer
+
+    def check(self, x):
+        scorer = self.scorer
+        passed = scorer.scores(x) >= scorer.threshold
+        with self._lock:
+            self.checked += len(passed)
+            self.rejected += int((~passed).sum())
+        return passed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "type": self.name,
+                "threshold": self._scorer.threshold if self._pid == os.getpid() else None,
+                "checked": self.checked,
+                "rejected": self.rejected,
+                "reject_rate": round(self.rejected / self.checked, 4) if self.checked else None,
+            }
+
+
+def build_food_gate(config):
+    """FoodGate sesuai config.FOOD_GATE ("off", "heuristic", "model"), atau None.
+
+    Aman dipanggil saat import: model gate baru dimuat saat gambar pertama diperiksa.
+    """
+    if config.FOOD_GATE == "heuristic":
+        return FoodGate(partial(
+            HeuristicGate,
+            min_food_fraction=config.FOOD_GATE_MIN_FOOD_FRACTION,
+            min_saturation=config.FOOD_GATE_MIN_SATURATION,
+        ), HeuristicGate.__name__)
+    if config.FOOD_GATE == "model":
+        return FoodGate(partial(
+            ModelGate, config.FOOD_GATE_MODEL_PATH, threshold=config.FOOD_GATE_THRESHOLD,
+        ), ModelGate.__name__)
+    return None
@@ -0,0 +1,38 @@
+import io
+
+from PIL import Image, ImageOps
+
+from services.metrics import timed
+
+FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+
+def derivative_object_name(digest, fmt="webp", folder_name="images"):
+    """Nama objek berbasis hash isi gambar: gambar yang sama disimpan sekali."""
+    return f"{folder_name}/{digest}.{FORMATS[fmt][2]}"
+
+
+def encode_derivative(image_bytes, max_side=640, fmt="webp", quality=80):
+    """Encode versi kecil gambar untuk ditampilkan (sisi terpanjang <= ``max_side``).
+
+    JPEG di-decode dengan draft mode pada skala terkecil yang masih >=
+    ``max_side``; orientasi EXIF diterapkan karena metadata tidak ikut
+    disimpan. Hasil: (bytes, content_type).
+    """
+    pil_format, content_type, _ = FORMATS[fmt]
+    with timed("derivative_encode"):
+        img = Image.open(io.BytesIO(image_bytes))
+        img.draft("RGB", (max_side, max_side))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        if pil_format == "WEBP":
+            img.save(buf, pil_format, quality=quality, method=4)
+        else:
+            img.save(buf, pil_format, quality=quality, optimize=True, progressive=True)
+    return buf.getvalue(), content_type
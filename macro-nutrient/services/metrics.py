@@ -0,0 +1,241 @@
+import collections
+import hmac
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import Response, abort, current_app, g, has_request_context, jsonify, request
+
+# Tahap auth tidak pernah dikirim di Server-Timing: durasinya membedakan email
+# terdaftar/tidak dan password benar/salah (timing oracle)
+PRIVATE_STAGES = frozenset({"user_lookup", "password_hash", "password_verify", "token_verify"})
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Counter Prometheus sederhana (per proses) dengan label opsional."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = collections.defaultdict(float)
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Gauge yang nilainya dibaca dari ``fn()`` saat /metrics diminta."""
+
+    def __init__(self, name, documentation, fn):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        _registry.append(self)
+
+    def render(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_value(self.fn())}"]
+
+
+class Histogram:
+    """Histogram Prometheus sederhana (per proses) dengan bucket kumulatif."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, count, total) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "macro_stage_duration_seconds", "Durasi per tahap pemrosesan request.", ("stage",))
+REQUEST_SECONDS = Histogram(
+    "macro_http_request_duration_seconds", "Durasi request HTTP.", ("endpoint", "method", "status"))
+
+
+@contextmanager
+def timed(stage):
+    """Catat durasi blok ke histogram tahap dan ke header Server-Timing request.
+
+    Bisa dipakai sebagai ``with timed("decode"):`` maupun decorator. Di luar
+    request (mis. thread persistence) hanya histogram yang diisi.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if has_request_context():
+            timings = g.setdefault("stage_timings", {})
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def render_metrics():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """Sampling profiler untuk satu thread request.
+
+    Thread pengambil sampel membaca stack thread target setiap ``interval``
+    detik lewat ``sys._current_frames()``; hasilnya berupa hitungan stack
+    (format collapsed, fungsi terluar lebih dulu).
+    """
+
+    def __init__(self, thread_id, interval=0.005, max_depth=40):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def top(self, n=10):
+        return self.samples.most_common(n)
+
+
+def _server_timing(timings, total):
+    parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items() if stage not in PRIVATE_STAGES]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _before_request():
+    g.request_start = time.perf_counter()
+    config = current_app.config
+    if config.get("PROFILE_SLOW_REQUEST_MS", 0) > 0 and random.random() < config.get("PROFILE_SAMPLE_RATE", 0):
+        g.profiler = SamplingProfiler(threading.get_ident(), interval=config.get("PROFILE_INTERVAL_MS", 5) / 1000).start()
+
+
+def _after_request(response):
+    start = g.pop("request_start", None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+
+    if current_app.config.get("SERVER_TIMING_ENABLED", False):
+        response.headers["Server-Timing"] = _server_timing(g.get("stage_timings", {}), elapsed)
+
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.stop()
+        if elapsed * 1000 >= current_app.config["PROFILE_SLOW_REQUEST_MS"]:
+            report = "\n".join(f"  {count:>5} {stack}" for stack, count in profiler.top())
+            current_app.logger.warning(
+                f"[SLOW REQUEST] {request.method} {endpoint} {elapsed * 1000:.0f} ms, "
+                f"{sum(profiler.samples.values())} sampel, stack teratas:\n{report}"
+            )
+    return response
+
+
+def ops_endpoint(fn):
+    """Batasi endpoint operasional dengan ``Authorization: Bearer <METRICS_TOKEN>``.
+
+    Tanpa METRICS_TOKEN endpoint dianggap nonaktif (404).
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        expected = current_app.config.get("METRICS_TOKEN")
+        if not expected:
+            abort(404)
+        auth_header = request.headers.get("Authorization", "")
+        token = auth_header[len("Bearer "):] if auth_header.startswith("Bearer ") else ""
+        if not hmac.compare_digest(token.encode(), expected.encode()):
+            return jsonify(error=True, message="Token metrics tidak valid"), 401, {"WWW-Authenticate": "Bearer"}
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+@ops_endpoint
+def _metrics_view():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """Pasang pengukuran durasi request, header Server-Timing dan endpoint /metrics."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule("/metrics", "metrics", _metrics_view, methods=["GET"])
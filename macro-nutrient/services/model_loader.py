@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+
+from config import Config
+from services.batcher import BatchScheduler
+from services.serving_profile import configure_tensorflow, tensorflow_threads
+
+
+def load_backend(warmup_batch_sizes=None):
+    """Muat model sesuai INFERENCE_BACKEND dan warm-up; hasil (keras_model, serving_fn).
+
+    TensorFlow baru di-import di sini supaya import ``app`` tetap cepat.
+    Keduanya None jika model gagal dimuat.
+    """
+    warmup_batch_sizes = warmup_batch_sizes or Config.WARMUP_BATCH_SIZES
+    keras_model = None
+    serving_fn = None
+    tf_threads = tensorflow_threads()
+
+    if Config.INFERENCE_BACKEND == "none":
+        print("[INFO] INFERENCE_BACKEND=none, model tidak dimuat.")
+    elif Config.INFERENCE_BACKEND == "tflite":
+        try:
+            from services.tflite_backend import TFLiteModel
+
+            num_threads = Config.TFLITE_NUM_THREADS or (tf_threads[0] if tf_threads else os.cpu_count() or 1)
+            serving_fn = TFLiteModel(Config.TFLITE_MODEL_PATH, num_threads=num_threads)
+            serving_fn.warmup()
+            print(f"[INFO] TFLite model loaded from {Config.TFLITE_MODEL_PATH}.")
+        except Exception as e:
+            serving_fn = None
+            print(f"[ERROR] Failed to load TFLite model: {e}")
+    else:
+        try:
+            from tensorflow.keras.models import load_model
+
+            if tf_threads:
+                configure_tensorflow(*tf_threads)
+            keras_model = load_model(Config.MODEL_PATH)
+            print("[INFO] Keras model loaded successfully.")
+        except Exception as e:
+            keras_model = None
+            print(f"[ERROR] Failed to load Keras model: {e}")
+
+        # Serving function dengan signature tetap, di-warm-up sebelum request pertama
+        if keras_model is not None:
+            try:
+                from services.serving import ServingFunction
+
+                serving_fn = ServingFunction(keras_model)
+                serving_fn.warmup(warmup_batch_sizes)
+                print(f"[INFO] Serving function warmed up for batch sizes {warmup_batch_sizes}.")
+            except Exception as e:
+                serving_fn = None
+                print(f"[ERROR] Failed to build serving function, falling back to Model.predict: {e}")
+
+    return keras_model, serving_fn
+
+
+def load_inference_model(app):
+    """Muat model, warm-up, lalu pasang ke app.config (beserta batcher jika aktif)."""
+    start = time.perf_counter()
+    keras_model, serving_fn = load_backend()
+
+    app.config["KERAS_MODEL"] = keras_model
+    app.config["SERVING_FN"] = serving_fn
+
+    # Micro-batching: gabungkan request predict yang datang bersamaan
+    if (serving_fn is not None or keras_model is not None) and Config.BATCHING_ENABLED:
+        app.config["INFERENCE_BATCHER"] = BatchScheduler(
+            serving_fn or keras_model.predict_on_batch,
+            max_batch_size=Config.BATCH_MAX_SIZE,
+            max_wait_ms=Config.BATCH_MAX_WAIT_MS,
+        )
+        print(f"[INFO] Inference batching enabled (max_batch_size={Config.BATCH_MAX_SIZE}, max_wait_ms={Config.BATCH_MAX_WAIT_MS}).")
+
+    app.config["MODEL_LOAD_SECONDS"] = round(time.perf_counter() - start, 3)
+
+
+def _load_and_mark_ready(app):
+    try:
+        load_inference_model(app)
+    finally:
+        app.config["MODEL_READY"].set()
+
+
+def preload_imports():
+    """Import TensorFlow/Keras tanpa membuat op apa pun (aman sebelum fork)."""
+    if Config.INFERENCE_BACKEND == "keras":
+        import tensorflow.keras.models  # noqa: F401
+        import services.serving  # noqa: F401
+    elif Config.INFERENCE_BACKEND == "tflite":
+        import services.tflite_backend  # noqa: F401
+
+
+def start_model_loading(app):
+    """Siapkan status readiness dan muat model (di background jika diaktifkan).
+
+    Dengan MODEL_LOAD_AFTER_FORK (gunicorn preload), proses master hanya
+    meng-import modul; runtime TensorFlow tidak fork-safe, jadi model dimuat
+    oleh setiap worker lewat ``start_worker_model_loading`` di hook post_fork.
+    """
+    app.config["MODEL_READY"] = threading.Event()
+    app.config.setdefault("KERAS_MODEL", None)
+    app.config.setdefault("SERVING_FN", None)
+    if Config.MODEL_LOAD_AFTER_FORK:
+        preload_imports()
+        return
+    start_worker_model_loading(app)
+
+
+def start_worker_model_loading(app):
+    """Muat model di proses ini (dipanggil langsung atau dari hook post_fork)."""
+    app.config["MODEL_READY"] = threading.Event()
+    if Config.MODEL_LOAD_IN_BACKGROUND:
+        threading.Thread(target=_load_and_mark_ready, args=(app,), name="model-loader", daemon=True).start()
+    else:
+        _load_and_mark_ready(app)
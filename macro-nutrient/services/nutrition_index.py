@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+
+def format_facts(item):
+    """Format satu entri nutrition_fact.json ke bentuk "facts" pada response."""
+    return {
+        "name": item.get("name").capitalize().replace('_', ' '),
+        "calories": str(item.get("calories")) + ' kcal',
+        "protein": str(item.get("protein")) + ' gram',
+        "carbohydrates": str(item.get("carbohydrates")) + ' gram',
+        "fat": str(item.get("fat")) + ' gram',
+        "gi": item.get("gi"),  # glycemic index jika ada
+        "gl": item.get("gl"),  # glycemic load jika ada
+    }
+
+
+class NutritionIndex:
+    """Fakta nutrisi yang sudah diformat, diindeks sesuai urutan class_names.
+
+    Dataset dibaca sekali saat startup dan setiap kelas wajib punya entri.
+    File hanya dibaca ulang jika mtime-nya berubah (dicek paling sering
+    sekali per ``check_interval`` detik). Dict yang dikembalikan dipakai
+    bersama, jadi jangan diubah oleh pemanggil.
+    """
+
+    def __init__(self, json_path, class_names, check_interval=1.0):
+        self.json_path = json_path
+        self.class_names = list(class_names)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._mtime = None
+        self._facts = ()
+        self._nutrients = ()
+        self._positions = {name: i for i, name in enumerate(self.class_names)}
+        self._load()
+
+    def _load(self):
+        mtime = os.stat(self.json_path).st_mtime_ns
+        with open(self.json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        by_name = {item.get('name'): item for item in data}
+        missing = [name for name in self.class_names if name not in by_name]
+        if missing:
+            raise ValueError(f"Fakta nutrisi tidak ditemukan untuk kelas: {', '.join(missing)}")
+
+        self._facts = tuple(format_facts(by_name[name]) for name in self.class_names)
+        self._nutrients = tuple(
+            {field: by_name[name].get(field) for field in ("calories", "protein", "carbohydrates", "fat")}
+            for name in self.class_names
+        )
+        self._mtime = mtime
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.json_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                self._load()
+                print(f"[INFO] Nutrition facts reloaded from {self.json_path}.")
+            except (OSError, ValueError) as e:
+                # Tetap pakai data lama; jangan coba ulang sampai file berubah lagi
+                self._mtime = mtime
+                print(f"[ERROR] Failed to reload nutrition facts, keeping previous data: {e}")
+
+    def get(self, idx):
+        """Facts untuk indeks kelas ``idx`` (sesuai urutan class_names)."""
+        self._maybe_reload()
+        return self._facts[idx]
+
+    def all(self):
+        """Facts semua kelas, tuple sesuai urutan class_names."""
+        self._maybe_reload()
+        return self._facts
+
+    def nutrients(self, label):
+        """Nilai numerik calories/protein/carbohydrates/fat untuk label, atau None."""
+        idx = self._positions.get(label)
+        if idx is None:
+            return None
+        self._maybe_reload()
+        return self._nutrients[idx]
@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from config import Config
+
+
+class PasswordPoolBusy(Exception):
+    """Terlalu banyak hashing password yang sedang antre."""
+
+
+def hash_prefix(method):
+    """Bagian ``method`` dari hash werkzeug, mis. "scrypt" -> "scrypt:32768:8:1"."""
+    name, *args = method.split(":")
+    if name == "scrypt":
+        return ":".join(["scrypt"] + (args or ["32768", "8", "1"]))
+    if name == "pbkdf2":
+        digest = args[0] if args else "sha256"
+        iterations = args[1] if len(args) > 1 else str(DEFAULT_PBKDF2_ITERATIONS)
+        return f"pbkdf2:{digest}:{iterations}"
+    return method
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify(stored_hash, password, method):
+    # Dijalankan di proses worker: cek password, lalu hash ulang jika parameternya lama
+    if not check_password_hash(stored_hash, password):
+        return False, None
+    if stored_hash.split("$", 1)[0] != hash_prefix(method):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+class PasswordHasher:
+    """Hashing password di process pool terpisah dengan jumlah antrean terbatas.
+
+    scrypt/pbkdf2 memakan CPU puluhan milidetik; di process pool pekerjaan
+    itu tidak menahan GIL worker gunicorn sehingga request lain (predict)
+    tetap jalan. Jika sudah ada ``max_pending`` job, ``PasswordPoolBusy``
+    dilempar agar route bisa membalas 503. ``workers=0`` berarti hashing
+    langsung di thread pemanggil.
+    """
+
+    def __init__(self, method="scrypt", workers=2, max_pending=64, timeout=10.0):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Pool dibuat per proses (setelah fork gunicorn) dengan start method spawn
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+        try:
+            executor = self._get_executor()
+            try:
+                return executor.submit(fn, *args).result(timeout=self.timeout)
+            except BrokenProcessPool:
+                # Worker mati (mis. OOM): buat pool baru dan coba sekali lagi
+                self._discard_executor(executor)
+                return self._get_executor().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    async def _run_async(self, fn, *args):
+        # Sama dengan _run untuk handler ASGI: event loop tidak tertahan selama hashing
+        if self.workers <= 0:
+            return await asyncio.to_thread(fn, *args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+        try:
+            executor = self._get_executor()
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(executor.submit(fn, *args)), self.timeout)
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                future = self._get_executor().submit(fn, *args)
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        finally:
+            self._slots.release()
+
+    def _discard_executor(self, broken):
+        # Thread lain bisa sudah mengganti pool yang rusak; hanya pool yang sama yang dibuang
+        with self._lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False)
+                self._executor = None
+                self._pid = None
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """(cocok, hash_baru); hash_baru tidak None jika perlu disimpan ulang."""
+        return self._run(_verify, stored_hash, password, self.method)
+
+    async def hash_async(self, password):
+        return await self._run_async(_hash, password, self.method)
+
+    async def verify_async(self, stored_hash, password):
+        return await self._run_async(_verify, stored_hash, password, self.method)
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    method=Config.PASSWORD_HASH_METHOD,
+    workers=Config.PASSWORD_HASH_WORKERS,
+    max_pending=Config.PASSWORD_HASH_MAX_PENDING,
+)
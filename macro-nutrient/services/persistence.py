@@ -0,0 +1,120 @@
+import os
+import queue
+import random
+import threading
+import time
+
+_STOP = object()
+
+
+class PersistenceQueue:
+    """Antrean background (write-behind) untuk upload GCS dan tulis Firestore.
+
+    Job berupa callable yang dijalankan oleh ``workers`` thread dengan retry
+    exponential backoff (+ jitter). Antrean dibatasi ``max_size``: jika
+    penuh, ``submit`` mengembalikan False agar pemanggil bisa menjalankan job
+    secara langsung. Job harus idempotent karena bisa diulang.
+    """
+
+    def __init__(self, workers=4, max_size=256, max_retries=3, backoff_base=0.5, backoff_max=8.0):
+        self.workers = max(1, int(workers))
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._queue = queue.Queue(maxsize=max_size)
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+
+    def _ensure_started(self):
+        # Thread tidak ikut ter-fork oleh gunicorn, jadi start per proses
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_size)
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"persistence-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for t in self._threads:
+                t.start()
+            self._pid = os.getpid()
+
+    def submit(self, fn, *args, **kwargs):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((fn, args, kwargs))
+            return True
+        except queue.Full:
+            return False
+
+    def depth(self):
+        return self._queue.qsize() if self._pid == os.getpid() else 0
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                self._run(*job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, fn, args, kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                fn(*args, **kwargs)
+                with self._lock:
+                    self.succeeded += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self.failed += 1
+                    print(f"[ERROR] Persistence job {getattr(fn, '__name__', fn)} failed after {attempt + 1} attempts: {e}")
+                    return
+                with self._lock:
+                    self.retries += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                time.sleep(delay * (0.5 + random.random() / 2))
+
+    def drain(self, timeout=30.0):
+        """Tunggu semua job selesai (maks ``timeout`` detik) lalu hentikan worker.
+
+        Dipanggil saat shutdown (hook gunicorn ``worker_exit``). Mengembalikan
+        jumlah job yang belum selesai.
+        """
+        if self._pid != os.getpid():
+            return 0
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._queue.all_tasks_done.wait(remaining)
+            pending = self._queue.unfinished_tasks
+        if pending:
+            print(f"[ERROR] Persistence queue drain timed out with {pending} job(s) pending.")
+            return pending
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        self._pid = None
+        return 0
+
+    def stats(self):
+        return {
+            "depth": self.depth(),
+            "max_size": self.max_size,
+            "workers": self.workers,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+def softmax(logits):
+    """Softmax per baris yang stabil secara numerik untuk array (N, num_classes)."""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def top_k(probs, k):
+    """Indeks dan nilai k kelas teratas per baris, terurut menurun: ((N, k), (N, k)).
+
+    Kelas seri diurutkan dari indeks terkecil, dan kolom pertama selalu sama
+    dengan ``probs.argmax(axis=1)``, berapa pun k dan jumlah kelas.
+    """
+    num_classes = probs.shape[1]
+    if k < num_classes:
+        idx = np.argpartition(probs, num_classes - k, axis=1)[:, num_classes - k:]
+    else:
+        idx = np.broadcast_to(np.arange(num_classes), probs.shape)
+    values = np.take_along_axis(probs, idx, axis=1)
+    order = np.lexsort((idx, -values), axis=1)
+    idx = np.take_along_axis(idx, order, axis=1)
+    # argpartition bebas memilih kelas seri mana yang masuk di batas k, jadi
+    # indeks terkecil dari nilai maksimum bisa tidak terpilih; nilainya sama
+    idx[:, 0] = probs.argmax(axis=1)
+    return idx, np.take_along_axis(values, order, axis=1)
+
+
+class Postprocessor:
+    """Ubah output model (N, num_classes) menjadi hasil prediksi dalam satu pass NumPy.
+
+    Setiap hasil berisi label teratas, confidence dalam persen (2 desimal),
+    facts nutrisi (hanya jika confidence >= ``threshold``) dan ``candidates``:
+    ``max_k`` pasangan (label, confidence) teratas. Dipakai bersama oleh
+    /inference/predict, /inference/predict/batch dan scripts/bulk_inference.py.
+    """
+
+    def __init__(self, class_names, nutrition_index, threshold=85, max_k=5, from_logits=False):
+        self.labels = np.array(class_names, dtype=object)
+        self.nutrition_index = nutrition_index
+        self.threshold = threshold
+        self.max_k = max(1, min(max_k, len(class_names)))
+        self.from_logits = from_logits
+
+    def __call__(self, preds):
+        probs = np.asarray(preds, dtype=np.float32)
+        if self.from_logits:
+            probs = softmax(probs)
+        idx, values = top_k(probs, self.max_k)
+        percents = np.round(values.astype(np.float64) * 100, 2)
+        accepted = percents[:, 0] >= self.threshold
+
+        facts = self.nutrition_index.all()
+        labels = self.labels[idx].tolist()
+        best = idx[:, 0].tolist()
+        percents = percents.tolist()
+        accepted = accepted.tolist()
+        return [
+            {
+                "label": labels[i][0],
+                "confidence": percents[i][0],
+                "facts": facts[best[i]] if accepted[i] else None,
+                "candidates": list(zip(labels[i], percents[i])),
+            }
+            for i in range(len(labels))
+        ]
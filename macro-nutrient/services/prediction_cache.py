@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def image_digest(image_bytes):
+    """Kunci cache: SHA-256 dari bytes gambar mentah."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+class SQLiteCacheBackend:
+    """Penyimpanan cache bersama antar worker gunicorn dalam satu instance.
+
+    Satu file SQLite (mode WAL) dipakai semua worker; setiap thread membuka
+    koneksinya sendiri.
+    """
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+    def _conn(self):
+        # Koneksi dibuat per thread dan per proses (tidak boleh ikut ter-fork)
+        if getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prediction_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_prediction_cache_accessed ON prediction_cache (accessed_at)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value FROM prediction_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE prediction_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Simpan entri; kembalikan jumlah entri yang dibuang karena melebihi batas."""
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO prediction_cache (key, value, accessed_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time()),
+        )
+        overflow = conn.execute("SELECT COUNT(*) FROM prediction_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM prediction_cache WHERE key IN ("
+                " SELECT key FROM prediction_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            return overflow
+        return 0
+
+
+class PredictionCache:
+    """LRU cache hasil prediksi (label, confidence, facts) per hash gambar.
+
+    Level pertama ada di memori proses (OrderedDict, dibatasi max_entries).
+    Jika ``shared`` diberikan (SQLiteCacheBackend), miss di memori dicari ke
+    sana dan setiap entri baru juga ditulis ke sana, sehingga worker lain ikut
+    memakai hasilnya.
+    """
+
+    def __init__(self, max_entries=1024, shared=None):
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except sqlite3.Error:
+                value = None
+            if value is not None:
+                self._put_local(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self._put_local(key, value)
+        if self.shared is not None:
+            try:
+                evicted = self.shared.set(key, value)
+            except sqlite3.Error:
+                evicted = 0
+            if evicted:
+                with self._lock:
+                    self.evictions += evicted
+
+    def _put_local(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from config import Config
+
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+FULL_SYNC = "*"
+
+
+def _micros(value):
+    if not isinstance(value, datetime):
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp()) * 1_000_000 + value.microsecond
+
+
+def _encode(data):
+    data = dict(data)
+    for field in TIMESTAMP_FIELDS:
+        if isinstance(data.get(field), datetime):
+            data[field] = data[field].isoformat()
+    return json.dumps(data, default=str)
+
+
+def _decode(text):
+    data = json.loads(text)
+    for field in TIMESTAMP_FIELDS:
+        if isinstance(data.get(field), str):
+            data[field] = datetime.fromisoformat(data[field])
+    return data
+
+
+class MirrorDocument:
+    """Pengganti snapshot Firestore (``id`` + ``to_dict()``) untuk baris mirror."""
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class PredictionMirror:
+    """Salinan lokal koleksi predictions di SQLite untuk history per user.
+
+    Setiap prediksi yang ditulis ke Firestore juga ditulis ke sini
+    (write-through, lihat services/store_data.py). Tabel diindeks
+    ``(user_id, created_us, id)`` sehingga satu halaman history adalah range
+    scan indeks, berapa pun jumlah prediksi user.
+
+    Mirror hanya dipakai untuk user yang "warm": sudah di-backfill oleh
+    scripts/sync_prediction_mirror.py (per user atau penuh). Prediksi yang
+    ditulis instance lain tidak lewat write-through instance ini, jadi user
+    dianggap dingin lagi ``max_age`` detik setelah sync terakhir (0 = tanpa
+    batas, hanya untuk satu instance); jalankan sync berkala di bawah batas itu.
+    """
+
+    def __init__(self, path, max_age=300):
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.write_errors = 0
+
+    def _conn(self):
+        # Koneksi per thread dan per proses (tidak boleh ikut ter-fork)
+        if getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " id TEXT PRIMARY KEY, user_id TEXT NOT NULL, created_us INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_user_created"
+                         " ON predictions (user_id, created_us, id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS synced_users (user_id TEXT PRIMARY KEY, synced_at REAL NOT NULL)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def upsert(self, docs):
+        """Tulis (doc_id, data) ke mirror dalam satu transaksi."""
+        rows = [(doc_id, data.get("user_id"), _micros(data.get("created_at")), _encode(data))
+                for doc_id, data in docs if data.get("user_id") is not None]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO predictions (id, user_id, created_us, data) VALUES (?, ?, ?, ?)",
+                             rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.writes += len(rows)
+        return len(rows)
+
+    def write_through(self, docs):
+        """Seperti ``upsert`` tetapi tidak pernah melempar error (Firestore tetap sumber utama)."""
+        try:
+            self.upsert(docs)
+        except sqlite3.Error as e:
+            with self._lock:
+                self.write_errors += 1
+            print(f"[ERROR] Gagal menulis prediction mirror: {e}")
+
+    def mark_synced(self, user_id=FULL_SYNC, synced_at=None):
+        self._conn().execute("INSERT OR REPLACE INTO synced_users (user_id, synced_at) VALUES (?, ?)",
+                             (user_id, synced_at or time.time()))
+
+    def last_synced(self, user_id=FULL_SYNC):
+        row = self._conn().execute("SELECT synced_at FROM synced_users WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else None
+
+    def is_warm(self, user_id):
+        try:
+            rows = self._conn().execute(
+                "SELECT MAX(synced_at) FROM synced_users WHERE user_id IN (?, ?)", (user_id, FULL_SYNC)
+            ).fetchone()
+        except sqlite3.Error:
+            return False
+        synced_at = rows[0]
+        if synced_at is None:
+            return False
+        return not self.max_age or time.time() - synced_at <= self.max_age
+
+    def history(self, user_id, limit=None, after=None):
+        """Dokumen user terbaru lebih dulu (created_at, id menurun), mulai setelah ``after``."""
+        sql = "SELECT id, data FROM predictions WHERE user_id = ?"
+        params = [user_id]
+        if after is not None:
+            created_us, doc_id = _micros(after[0]), after[1]
+            sql += " AND (created_us < ? OR (created_us = ? AND id < ?))"
+            params += [created_us, created_us, doc_id]
+        sql += " ORDER BY created_us DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._conn().execute(sql, params).fetchall()
+        with self._lock:
+            self.reads += 1
+        return [MirrorDocument(doc_id, _decode(data)) for doc_id, data in rows]
+
+    def stats(self):
+        with self._lock:
+            stats = {"path": self.path, "max_age": self.max_age, "reads": self.reads,
+                     "writes": self.writes, "write_errors": self.write_errors}
+        stats["full_sync_at"] = self.last_synced()
+        return stats
+
+
+prediction_mirror = PredictionMirror(
+    Config.PREDICTION_MIRROR_PATH, Config.PREDICTION_MIRROR_MAX_AGE
+) if Config.PREDICTION_MIRROR_PATH else None
@@ -0,0 +1,99 @@
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+
+from flask import Response, request
+
+CachedResponse = namedtuple("CachedResponse", ["body", "etag"])
+
+
+def strong_etag(body):
+    """ETag kuat dari isi response (tanpa tanda kutip)."""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+class ResponseCache:
+    """Cache read-through response JSON yang sudah diserialisasi, beserta ETag-nya.
+
+    LRU di memori proses, dibatasi ``max_entries``; setiap entri punya TTL
+    sendiri. Untuk data per user (history), kunci menyertakan ``version(user)``.
+    ``invalidate_user`` menaikkan versi itu sehingga entri lama tidak pernah
+    dibaca lagi, termasuk entri yang sedang diisi oleh request yang mulai
+    sebelum invalidasi. Versi disimpan di ``stripes`` slot tetap (hash user id),
+    jadi memori tidak tumbuh dengan jumlah user; user lain di slot yang sama
+    hanya ikut kehilangan cache-nya.
+    """
+
+    def __init__(self, max_entries=2048, ttl=15, stripes=4096):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._versions = [0] * stripes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _stripe(self, user_id):
+        return zlib.crc32(str(user_id).encode()) % len(self._versions)
+
+    def version(self, user_id):
+        return self._versions[self._stripe(user_id)]
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._versions[self._stripe(user_id)] += 1
+            self.invalidations += 1
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, body, ttl=None):
+        entry = CachedResponse(body, strong_etag(body))
+        with self._lock:
+            self._entries[key] = (entry, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def etag_headers(entry):
+    """Header ETag dan Cache-Control untuk CachedResponse.
+
+    ``no-cache`` membuat client selalu revalidasi dengan ETag, sehingga
+    polling yang datanya tidak berubah cukup dibalas 304.
+    """
+    return {"ETag": f'"{entry.etag}"', "Cache-Control": "private, no-cache"}
+
+
+def json_response(entry, status=200):
+    """Response dari CachedResponse: 304 tanpa body jika If-None-Match cocok."""
+    headers = etag_headers(entry)
+    if request.if_none_match.contains(entry.etag):
+        return Response(status=304, headers=headers)
+    return Response(entry.body, status=status, mimetype="application/json", headers=headers)
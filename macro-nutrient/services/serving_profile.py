@@ -0,0 +1,85 @@
+import math
+import os
+
+# Env override untuk layout; nilai kosong/0 berarti dihitung dari jumlah CPU
+WORKERS_ENV = "GUNICORN_WORKERS"
+THREADS_ENV = "GUNICORN_THREADS"
+INTRA_OP_ENV = "TF_INTRA_OP_THREADS"
+INTER_OP_ENV = "TF_INTER_OP_THREADS"
+
+# Cukup untuk ADMISSION_MAX_CONCURRENT + ADMISSION_MAX_QUEUE request inference
+# sambil tetap melayani request ringan (history, auth)
+DEFAULT_THREADS = 16
+
+
+def available_cpus():
+    """Jumlah CPU yang benar-benar boleh dipakai (kuota cgroup dan affinity).
+
+    ``os.cpu_count()`` di container Cloud Run/Docker mengembalikan jumlah core
+    host, bukan kuota container.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            limit, period = f.read().split()
+            if limit != "max":
+                quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def _env_int(name):
+    value = os.getenv(name, "").strip()
+    return int(value) if value and int(value) > 0 else None
+
+
+def serving_layout(cpus=None):
+    """Layout worker gunicorn x thread dan thread TensorFlow per worker.
+
+    Default: satu worker per 2 CPU (model dimuat per worker), 16 thread gthread
+    per worker untuk request yang menunggu I/O, dan intra-op TF = CPU dibagi
+    jumlah worker supaya total thread komputasi tidak melebihi jumlah core.
+    Pilih nilai terbaik untuk mesin tertentu dengan benchmarks/bench_layout.py.
+    """
+    cpus = cpus or available_cpus()
+    workers = _env_int(WORKERS_ENV) or _env_int("WEB_CONCURRENCY") or max(1, cpus // 2)
+    threads = _env_int(THREADS_ENV) or DEFAULT_THREADS
+    intra_op = _env_int(INTRA_OP_ENV) or max(1, cpus // workers)
+    inter_op = _env_int(INTER_OP_ENV) or 1
+    return {"cpus": cpus, "workers": workers, "threads": threads, "intra_op": intra_op, "inter_op": inter_op}
+
+
+def tensorflow_threads():
+    """(intra_op, inter_op) dari env, atau None jika tidak diset (default TensorFlow)."""
+    intra_op = _env_int(INTRA_OP_ENV)
+    inter_op = _env_int(INTER_OP_ENV)
+    if intra_op is None and inter_op is None:
+        return None
+    return intra_op or 0, inter_op or 0
+
+
+def configure_tensorflow(intra_op, inter_op):
+    """Set thread pool TensorFlow; harus dipanggil sebelum op/model pertama dibuat."""
+    import tensorflow as tf
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError as e:
+        # Runtime TF sudah terinisialisasi di proses ini; nilai lama tetap dipakai
+        print(f"[WARN] TensorFlow threading not applied: {e}")
@@ -1,17 +1,12 @@
 from google.cloud import firestore
 from google.auth import exceptions
-from config import Config
-
-_db = None
+from services.clients import get_firestore
+from services.metrics import timed
+from services.prediction_mirror import prediction_mirror
 
 def initialize_firestore():
-    global _db
-    if _db is not None:
-        return _db
     try:
-        _db = firestore.Client(project=Config.PROJECT_ID)
-        print("Firestore client berhasil diinisialisasi.")
-        return _db
+        return get_firestore()
     except exceptions.DefaultCredentialsError as e:
         print(f"Gagal menginisialisasi Firestore: {e}")
         raise
@@ -19,10 +14,39 @@ def initialize_firestore():
 def store_data(collection, doc_id, data):
     db = initialize_firestore()
     doc_ref = db.collection(collection).document(doc_id)
-    doc_ref.set(data)
+    with timed("firestore_write"):
+        doc_ref.set(data)
+    if collection == "predictions" and prediction_mirror is not None:
+        prediction_mirror.write_through([(doc_id, data)])
     print(f"Data untuk dokumen {doc_id} berhasil disimpan di koleksi {collection}.")
 
+def store_data_batch(collection, docs, merges=()):
+    """Buat beberapa dokumen baru (doc_id, data) dalam satu batch write Firestore.
+
+    ``merges`` berisi (collection, doc_id, data) tambahan yang ditulis dengan
+    merge=True di batch yang sama (mis. increment agregat harian). Dokumen
+    ditulis dengan ``create`` sehingga batch yang diulang setelah commit
+    berhasil gagal seluruhnya dengan ``AlreadyExists`` dan increment tidak
+    dihitung dua kali.
+    """
+    db = initialize_firestore()
+    batch = db.batch()
+    for doc_id, data in docs:
+        batch.create(db.collection(collection).document(doc_id), data)
+    for merge_collection, doc_id, data in merges:
+        batch.set(db.collection(merge_collection).document(doc_id), data, merge=True)
+    with timed("firestore_write"):
+        batch.commit()
+    # Write-through ke mirror lokal setelah commit berhasil; error mirror tidak
+    # dilempar agar job persistence tidak diulang hanya karena mirror
+    if collection == "predictions" and prediction_mirror is not None:
+        prediction_mirror.write_through(docs)
+    print(f"{len(docs)} dokumen berhasil disimpan di koleksi {collection}.")
+
 def get_user_predictions(user_id):
+    # Dari mirror lokal jika user sudah di-sync (range scan indeks, tanpa read Firestore)
+    if prediction_mirror is not None and prediction_mirror.is_warm(user_id):
+        return [dict(doc.to_dict(), id=doc.id) for doc in prediction_mirror.history(user_id)]
     db = initialize_firestore()
     docs = db.collection("predictions")\
              .where("user_id", "==", user_id)\
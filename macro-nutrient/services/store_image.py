@@ -1,11 +1,11 @@
 import uuid
-from google.cloud import storage
+from services.clients import get_bucket, get_storage
 
 class ImageStorageService:
     def __init__(self, bucket_name):
         self.bucket_name = bucket_name
-        self.storage_client = storage.Client()
-        self.bucket = self.storage_client.bucket(bucket_name)
+        self.storage_client = get_storage()
+        self.bucket = get_bucket(bucket_name)
 
     def upload_image(self, file):
         """Fungsi untuk mengupload gambar ke GCS dan mengembalikan URL publik"""
@@ -0,0 +1,47 @@
+import threading
+
+import numpy as np
+
+# Pakai runtime ringan jika terpasang (tanpa paket tensorflow penuh)
+try:
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+
+
+class TFLiteModel:
+    """Backend inference berbasis TFLite interpreter.
+
+    Dipanggil seperti ServingFunction: ``model(x)`` dengan x float32
+    (n, 224, 224, 3) dan mengembalikan probabilitas (n, num_classes).
+    Interpreter tidak thread-safe, jadi setiap pemanggilan dikunci.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input_index = self.interpreter.get_input_details()[0]["index"]
+        self._output_index = self.interpreter.get_output_details()[0]["index"]
+        self._batch_size = int(self.interpreter.get_input_details()[0]["shape"][0])
+        self._lock = threading.Lock()
+
+    def __call__(self, x):
+        x = np.asarray(x, dtype="float32")
+        with self._lock:
+            if len(x) != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input_index, x.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = len(x)
+            self.interpreter.set_tensor(self._input_index, x)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output_index).copy()
+
+    def warmup(self, batch_sizes=(1,)):
+        for n in batch_sizes:
+            self(np.zeros((n, 224, 224, 3), dtype="float32"))